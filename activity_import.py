@@ -0,0 +1,247 @@
+"""
+Import de activități în masă
+
+Validarea și inserarea sunt comune tuturor surselor (API JSON/NDJSON, fișiere
+CSV/XLSX în formatul exportului, migrarea fișierelor JSON vechi). Rândurile
+valide sunt inserate în loturi: fiecare lot este o singură instrucțiune
+executemany plus actualizarea rollup-ului pentru tot lotul, într-o tranzacție
+proprie.
+"""
+
+import csv
+import io
+import itertools
+import json
+import math
+import re
+import unicodedata
+from datetime import datetime, date
+from sqlalchemy import insert
+from models import Activity
+from rollup import add_delta, apply_deltas
+from data_version import bump_data_version
+
+# Câte rânduri intră într-o tranzacție
+CHUNK_SIZE = 1000
+# Câte erori per rând se raportează înapoi (restul sunt doar numărate)
+MAX_REPORTED_ERRORS = 1000
+
+REQUIRED_FIELDS = ('date', 'client', 'project', 'activity_type', 'hours')
+TEXT_FIELDS = ('client', 'project', 'activity_type', 'achievements', 'challenges')
+
+# YYYY-MM-DD (luna și ziua pot fi nepadate), urmată opțional de ora scrisă în
+# textele dată-oră din Excel sau ISO 8601: "2025-01-07 00:00:00", "2025-01-07T08:30"
+DATE_TEXT = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})(?:[T ](\d{1,2}):(\d{2})(?::(\d{2})(?:\.\d+)?)?)?')
+
+def parse_date(value):
+    """
+    Acceptă obiecte date/datetime și texte YYYY-MM-DD, inclusiv nepadate
+    (2025-1-07) sau cu oră (vezi DATE_TEXT); orice alt text este respins.
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not isinstance(value, str):
+        raise ValueError('Data trebuie să fie în formatul YYYY-MM-DD')
+    match = DATE_TEXT.fullmatch(value.strip())
+    if match is None:
+        raise ValueError(f'Dată invalidă: {value}')
+    try:
+        return datetime(*(int(part or 0) for part in match.groups())).date()
+    except ValueError:
+        raise ValueError(f'Dată invalidă: {value}')
+
+def parse_activity(raw, user_id):
+    """
+    Validează un rând și întoarce valorile pentru tabela activities.
+
+    Ridică ValueError cu un mesaj pentru utilizator dacă rândul nu este valid.
+    """
+    if not isinstance(raw, dict):
+        raise ValueError('Fiecare activitate trebuie să fie un obiect JSON')
+    missing = [field for field in REQUIRED_FIELDS if raw.get(field) in (None, '')]
+    if missing:
+        raise ValueError(f"Câmpuri obligatorii lipsă: {', '.join(missing)}")
+
+    try:
+        hours = float(raw['hours'])
+    except (TypeError, ValueError):
+        raise ValueError(f"Număr de ore invalid: {raw['hours']}")
+    if not math.isfinite(hours) or hours <= 0 or hours > 24:
+        raise ValueError('Numărul de ore trebuie să fie între 0 și 24')
+
+    values = {'user_id': user_id, 'date': parse_date(raw['date']), 'hours': hours}
+    for field in TEXT_FIELDS:
+        value = raw.get(field)
+        values[field] = '' if value is None else str(value).strip()
+    return values
+
+def iter_ndjson(stream):
+    """
+    Citește un flux NDJSON linie cu linie și produce perechi (număr_linie, obiect).
+
+    O linie care nu este JSON valid este produsă ca ValueError, ca să fie
+    raportată împreună cu celelalte erori de validare.
+    """
+    for line_number, line in enumerate(stream, 1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, ValueError('Linie JSON invalidă')
+
+# Coloanele fișierelor exportate (vezi exports.ACTIVITY_COLUMNS) și câmpurile lor.
+# 'Angajat' este ignorată: rândurile sunt importate pentru utilizatorul curent.
+FILE_COLUMNS = {
+    'Data': 'date',
+    'Client': 'client',
+    'Proiect': 'project',
+    'Tip Activitate': 'activity_type',
+    'Ore': 'hours',
+    'Realizări': 'achievements',
+    'Provocări': 'challenges',
+}
+
+def _normalize_header(value):
+    """'Realizări ' -> 'realizari', ca antetele să fie recunoscute și fără diacritice"""
+    text = unicodedata.normalize('NFKD', str(value or '')).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(text.lower().split())
+
+def _map_header(header):
+    lookup = {_normalize_header(name): field for name, field in FILE_COLUMNS.items()}
+    fields = [lookup.get(_normalize_header(name)) for name in header]
+    missing = [name for name, field in FILE_COLUMNS.items()
+               if field in REQUIRED_FIELDS and field not in fields]
+    if missing:
+        raise ValueError(f"Coloane obligatorii lipsă în fișier: {', '.join(missing)}")
+    return fields
+
+def _file_record(fields, values):
+    record = {field: value for field, value in zip(fields, values) if field}
+    # Foile de calcul românești folosesc adesea virgula zecimală ("7,5")
+    if isinstance(record.get('hours'), str):
+        record['hours'] = record['hours'].replace(',', '.')
+    return record
+
+def _decode_errors(row_numbers, rows):
+    """Oprește citirea la primul rând care nu poate fi decodat și îl raportează ca eroare"""
+    row_number = 1
+    try:
+        for row_number, values in zip(row_numbers, rows):
+            yield row_number, values
+    except (UnicodeDecodeError, csv.Error) as e:
+        yield row_number + 1, ValueError(f'Fișierul nu poate fi citit de la acest rând: {e}')
+
+def csv_records(stream):
+    """
+    Citește un CSV în formatul exportului rând cu rând.
+
+    Antetul este validat imediat (ValueError dacă lipsesc coloane obligatorii);
+    rândurile sunt produse ca perechi (număr_rând, dicționar), numerotate ca în
+    foaia de calcul (antetul este rândul 1).
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    reader = csv.reader(text)
+    try:
+        fields = _map_header(next(reader, []))
+    except (UnicodeDecodeError, csv.Error):
+        raise ValueError('Fișierul CSV trebuie să fie text UTF-8')
+    return (
+        (row_number, _file_record(fields, values))
+        for row_number, values in _decode_errors(itertools.count(2), reader)
+        if any(values)
+    )
+
+def xlsx_records(stream):
+    """
+    Citește prima foaie a unui fișier .xlsx în modul read-only al openpyxl,
+    care parcurge XML-ul foii fără să încarce tot workbook-ul în memorie.
+    """
+    from openpyxl import load_workbook
+
+    try:
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+    except Exception:
+        raise ValueError('Fișierul nu este un document Excel (.xlsx) valid')
+    rows = workbook.worksheets[0].iter_rows(values_only=True)
+    try:
+        fields = _map_header(next(rows, ()))
+    except ValueError:
+        workbook.close()
+        raise
+
+    def records():
+        try:
+            for row_number, values in enumerate(rows, 2):
+                if any(value not in (None, '') for value in values):
+                    yield row_number, _file_record(fields, values)
+        finally:
+            workbook.close()
+    return records()
+
+def insert_chunk(db, mappings):
+    """Inserează un lot de activități deja validate și actualizează rollup-ul și versiunea datelor; nu face commit"""
+    if not mappings:
+        return
+    db.execute(insert(Activity.__table__), mappings)
+    deltas = {}
+    for values in mappings:
+        add_delta(deltas, values)
+    apply_deltas(db, deltas)
+    bump_data_version(db, {values['user_id'] for values in mappings})
+
+def iter_import(db, user_id, records, chunk_size=CHUNK_SIZE):
+    """
+    Validează și inserează activități pentru un utilizator, lot cu lot.
+
+    `records` produce perechi (număr_rând, dicționar); în locul dicționarului
+    poate apărea un ValueError pentru rânduri care nu au putut fi citite.
+    Fiecare lot valid este comis separat; un lot respins de baza de date este
+    anulat și raportat ca eroare pe rândurile lui. După fiecare lot este produs
+    rezultatul de până atunci (același dicționar, actualizat pe loc).
+    """
+    result = {'processed': 0, 'inserted': 0, 'error_count': 0, 'errors': []}
+
+    def report_error(row_number, message):
+        result['error_count'] += 1
+        if len(result['errors']) < MAX_REPORTED_ERRORS:
+            result['errors'].append({'row': row_number, 'error': message})
+
+    def flush(chunk):
+        try:
+            insert_chunk(db, [values for _, values in chunk])
+            db.commit()
+            result['inserted'] += len(chunk)
+        except Exception as e:
+            db.rollback()
+            for row_number, _ in chunk:
+                report_error(row_number, f'Eroare la salvare: {e}')
+
+    chunk = []
+    for row_number, raw in records:
+        result['processed'] += 1
+        if isinstance(raw, ValueError):
+            report_error(row_number, str(raw))
+            continue
+        try:
+            chunk.append((row_number, parse_activity(raw, user_id)))
+        except ValueError as e:
+            report_error(row_number, str(e))
+            continue
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+            yield result
+    if chunk:
+        flush(chunk)
+    yield result
+
+def import_activities(db, user_id, records, chunk_size=CHUNK_SIZE):
+    """Ca iter_import, dar întoarce doar rezultatul final"""
+    for result in iter_import(db, user_id, records, chunk_size):
+        pass
+    return result
@@ -0,0 +1,253 @@
+"""
+Stocarea activităților pentru aplicația de linie de comandă (main.py)
+
+Implicit (JournalStorage), activitățile sunt păstrate în două fișiere:
+  - activities.json, snapshot-ul complet (dicționar id -> activitate, formatul
+    folosit deja de fișierele vechi);
+  - activities.jsonl, jurnalul activităților adăugate după ultimul snapshot,
+    câte un obiect JSON pe linie.
+
+O activitate nouă este doar adăugată la sfârșitul jurnalului (cu fsync), deci
+costul unei adăugări nu depinde de numărul de activități existente. Când
+jurnalul ajunge la `compact_every` înregistrări, snapshot-ul este rescris
+într-un fișier temporar și înlocuit atomic (os.replace), apoi jurnalul este
+golit. La pornire se citește snapshot-ul și se reaplică jurnalul; o ultimă
+linie scrisă pe jumătate (de exemplu la o cădere de curent) este eliminată.
+
+SqlActivityStorage folosește în schimb baza de date a aplicației web, ca
+activitățile introduse din CLI să apară în aceleași rapoarte.
+"""
+
+import json
+import os
+
+# După câte activități adăugate este rescris snapshot-ul
+COMPACT_EVERY = 1000
+
+class JournalStorage:
+    def __init__(self, filename='activities.json', journal_filename=None, compact_every=COMPACT_EVERY):
+        self.filename = filename
+        self.journal_filename = journal_filename or os.path.splitext(filename)[0] + '.jsonl'
+        self.compact_every = compact_every
+        self.journal_records = 0
+        self._journal = None
+
+    @property
+    def needs_compaction(self):
+        return self.journal_records >= self.compact_every
+
+    def load(self):
+        """Toate activitățile: snapshot-ul plus jurnalul, în ordinea adăugării"""
+        activities = {}
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            snapshot = []
+
+        # Snapshot-ul poate fi dicționarul id -> activitate sau lista scrisă de
+        # versiunile vechi ale aplicației, unde activitățile nu aveau id
+        items = snapshot.items() if isinstance(snapshot, dict) else ((None, a) for a in snapshot)
+        last_id = 0
+        for key, activity in items:
+            if activity.get('activity_id') is None:
+                activity['activity_id'] = int(key) if key is not None else last_id + 1
+            last_id = max(last_id, activity['activity_id'])
+            activities[activity['activity_id']] = activity
+
+        # O activitate din jurnal poate exista deja în snapshot dacă procesul s-a
+        # oprit între scrierea snapshot-ului și golirea jurnalului
+        self.journal_records = 0
+        for activity in self._replay_journal():
+            activities[activity['activity_id']] = activity
+            self.journal_records += 1
+        return list(activities.values())
+
+    def _replay_journal(self):
+        try:
+            f = open(self.journal_filename, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            offset = 0
+            for line in f:
+                if not line.strip():
+                    offset += len(line)
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    if f.read(1) or line.endswith(b'\n'):
+                        raise ValueError(f'{self.journal_filename}: linie invalidă la poziția {offset}')
+                    # Ultima linie a rămas scrisă pe jumătate: o eliminăm, ca
+                    # următoarea adăugare să înceapă pe o linie nouă
+                    f.close()
+                    os.truncate(self.journal_filename, offset)
+                    return
+                offset += len(line)
+                yield record
+
+    def append(self, activity):
+        """Adaugă activitatea în jurnal; revine după ce linia a ajuns pe disc"""
+        if self._journal is None:
+            self._journal = open(self.journal_filename, 'a', encoding='utf-8')
+        self._journal.write(json.dumps(activity, ensure_ascii=False) + '\n')
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self.journal_records += 1
+
+    def compact(self, activities):
+        """Rescrie snapshot-ul cu toate activitățile și golește jurnalul"""
+        temp_filename = self.filename + '.tmp'
+        with open(temp_filename, 'w', encoding='utf-8') as f:
+            json.dump({str(a['activity_id']): a for a in activities}, f, indent=4, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_filename, self.filename)
+
+        self.close()
+        open(self.journal_filename, 'w').close()
+        self.journal_records = 0
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+# Câte activități adăugate din CLI sunt salvate într-o singură tranzacție
+SQL_BATCH_SIZE = 100
+
+class SqlActivityStorage:
+    """
+    Activitățile unui utilizator din baza de date a aplicației web.
+
+    Activitățile adăugate sunt salvate în loturi (o instrucțiune executemany și
+    un commit la `batch_size` activități, la închidere sau înaintea oricărei
+    citiri), prin același cod ca importul în masă, deci rollup-ul folosit de
+    rapoartele web rămâne la zi. Căutările și rapoartele sunt interogări SQL:
+    nimic nu este încărcat integral în memoria procesului.
+
+    Modulele bazei de date sunt importate doar aici, ca varianta cu fișiere
+    JSON să nu aibă nevoie de configurarea bazei de date.
+    """
+
+    def __init__(self, username, batch_size=SQL_BATCH_SIZE):
+        from database import SessionLocal
+        from models import User
+
+        self.db = SessionLocal()
+        self.user_id = self.db.query(User.id).filter(User.username == username).scalar()
+        if self.user_id is None:
+            self.db.close()
+            raise ValueError(f'Utilizatorul {username!r} nu există în baza de date')
+        self.batch_size = batch_size
+        self.pending = []
+
+    def add(self, activity):
+        """Validează activitatea și o pune în lotul următor; ridică ValueError dacă nu este validă"""
+        from activity_import import parse_activity
+
+        self.pending.append(parse_activity(activity, self.user_id))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        from activity_import import insert_chunk
+
+        if not self.pending:
+            return
+        try:
+            insert_chunk(self.db, self.pending)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        self.pending = []
+
+    def _filters(self, **filters):
+        return dict(filters, user_ids=[self.user_id])
+
+    def _activities(self, *criteria):
+        from models import Activity
+
+        self.flush()
+        query = self.db.query(
+            Activity.id, Activity.date, Activity.client, Activity.project, Activity.activity_type,
+            Activity.achievements, Activity.challenges, Activity.hours
+        ).filter(Activity.user_id == self.user_id, *criteria).order_by(Activity.date, Activity.id)
+        for row in query.yield_per(1000):
+            activity = row._asdict()
+            activity['activity_id'] = activity.pop('id')
+            activity['date'] = activity['date'].isoformat()
+            yield activity
+
+    def iter_activities(self):
+        return self._activities()
+
+    def _names_matching(self, column, matches):
+        """
+        Condiția pentru valorile coloanei (client/proiect) ale utilizatorului al
+        căror casefold() satisface `matches`.
+
+        Comparația se face în Python, ca în JournalStorage: lower() din SQLite
+        schimbă doar literele ASCII ("Ștefan" nu ar fi găsit după "ștefan").
+        Valorile distincte ale unui utilizator sunt puține, iar condiția finală
+        este un IN pe coloană, care poate folosi indexul (user_id, client, date),
+        respectiv (user_id, project, date).
+        """
+        from sqlalchemy import or_
+        from models import Activity
+
+        self.flush()
+        names = [name for name, in self.db.query(column).filter(Activity.user_id == self.user_id).distinct()
+                 if matches((name or '').casefold())]
+        condition = column.in_([name for name in names if name is not None])
+        return or_(condition, column.is_(None)) if None in names else condition
+
+    def search(self, field, value):
+        """
+        Aceleași potriviri ca EmployeeActivity.search_activities, ca interogări
+        SQL; rezultatele sunt ordonate după dată și id.
+        """
+        from activity_import import parse_date
+        from models import Activity
+
+        if field == 'date':
+            try:
+                return list(self._activities(Activity.date == parse_date(value)))
+            except ValueError:
+                return []
+        if field == 'project':
+            project = value.strip().casefold()
+            return list(self._activities(self._names_matching(Activity.project, lambda name: name == project)))
+        if field != 'client':
+            raise ValueError(f'Câmp de căutare necunoscut: {field}')
+        prefix = value.strip().casefold()
+        return list(self._activities(self._names_matching(Activity.client, lambda name: name.startswith(prefix))))
+
+    def period_report(self, start_date, end_date):
+        """Totalurile perioadei calculate de baza de date (din rollup) și activitățile ei"""
+        from models import Activity
+        from report_engine import run_report
+
+        self.flush()
+        report = run_report(self.db, self._filters(start_date=start_date, end_date=end_date))
+        return {
+            'activities': list(self._activities(Activity.date >= start_date, Activity.date <= end_date)),
+            'total_hours': report['total_hours'],
+            'hours_per_client': report['breakdowns']['client'],
+            'hours_per_project': report['breakdowns']['project'],
+        }
+
+    def hours_by(self, field):
+        """Orele pe client sau pe proiect, pentru tot istoricul"""
+        from report_engine import run_report
+
+        self.flush()
+        return run_report(self.db, self._filters(), group_by=(field,))['breakdowns'][field]
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.db.close()
@@ -6,21 +6,32 @@ including time spent on different projects, clients, and tasks. It supports
 activity logging, reporting, and data export features.
 """
 
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_file
-from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, g, Response, stream_with_context, make_response
+from datetime import datetime, date
 import os
+import json
+import hashlib
 from werkzeug.security import generate_password_hash, check_password_hash
-from contextlib import contextmanager
-import pandas as pd
-from io import BytesIO
-from models import User, Activity, Leave, Expense, user_to_dict, activity_to_dict, leave_to_dict, expense_to_dict
+from models import User, Activity, ActivityDailyRollup, UserDataVersion, Leave, Expense, user_to_dict, leave_to_dict, expense_to_dict
 from database import engine, Base, SessionLocal
+from migrations import upgrade, require_current_schema
+from report_engine import run_report, list_activities, page_activities, ACTIVITY_FIELDS
+from rollup import record_activity
+from data_version import bump_data_version, get_data_version
+from activity_import import import_activities, iter_import, iter_ndjson, csv_records, xlsx_records
+from cache import TTLCache
+import instrumentation
+import metrics
+import slow_query_log
+import time
+from exports import (ACTIVITY_COLUMNS, EXPENSE_COLUMNS, activity_rows, expense_rows, iter_csv,
+                     write_xlsx, iter_file, remove_file, attachment_headers)
 from dotenv import load_dotenv
 from functools import wraps
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, and_, case
 import calendar
+from collections import namedtuple
 from datetime import timedelta
 
 # Încarcă variabilele de mediu
@@ -29,6 +40,95 @@ load_dotenv()
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'your-secret-key-here')
 
+# Server-Timing și un log JSON per request (durată, interogări SQL, randare)
+instrumentation.init_app(app, engine)
+
+# Interogările peste SLOW_QUERY_MS, cu planul lor de execuție, în SLOW_QUERY_LOG
+slow_query_log.init_engine(engine)
+
+# `python app.py` aduce baza de date locală la zi; sub gunicorn migrațiile sunt
+# aplicate de pasul release din Procfile, iar aici doar verificăm că au rulat
+if __name__ == '__main__':
+    upgrade(engine)
+else:
+    require_current_schema(engine)
+
+def get_db():
+    """
+    Sesiunea de bază de date a request-ului curent.
+
+    Se deschide abia la prima utilizare, așa că paginile care nu ating baza de
+    date nu ocupă o conexiune din pool, și se închide în teardown_appcontext.
+    """
+    if 'db' not in g:
+        g.db = SessionLocal()
+    return g.db
+
+@app.teardown_appcontext
+def close_db(exception=None):
+    db = g.pop('db', None)
+    if db is not None:
+        # Orice modificare necomisă (de ex. după o eroare) este anulată
+        if exception is not None:
+            db.rollback()
+        db.close()
+
+# Tipuri de conținut acceptate pentru importul NDJSON
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+# Paginarea listei de activități: mărimea implicită și maximă a unei pagini
+ACTIVITY_PAGE_SIZE = 50
+MAX_ACTIVITY_PAGE_SIZE = 500
+
+# Cifrele de pe dashboard, per utilizator, împreună cu versiunea datelor din care au
+# fost calculate; o scriere făcută de alt worker schimbă versiunea și recalculăm
+dashboard_cache = TTLCache(ttl=int(os.environ.get('DASHBOARD_CACHE_TTL', 60)))
+
+# Utilizatorii autentificați (id -> date de bază), păstrați scurt timp în fiecare worker.
+# Ștergerea contului și schimbarea parolei invalidează intrarea doar în worker-ul
+# care le-a procesat; de aceea load_current_user verifică la fiecare request că
+# un utilizator din cache mai există.
+CurrentUser = namedtuple('CurrentUser', ['id', 'username', 'email', 'is_admin'])
+user_cache = TTLCache(ttl=int(os.environ.get('USER_CACHE_TTL', 60)))
+
+# Metrici Prometheus la /metrics, adunate din toți workerii
+metrics.init_app(app, engine, caches={'dashboard': dashboard_cache, 'user': user_cache})
+
+def hash_password(password):
+    with metrics.timed('worktracker_password_hash_duration_seconds', op='hash'):
+        return generate_password_hash(password)
+
+def verify_password(password_hash, password):
+    with metrics.timed('worktracker_password_hash_duration_seconds', op='verify'):
+        return check_password_hash(password_hash, password)
+
+def load_current_user(user_id):
+    """
+    Datele utilizatorului, din cache sau din baza de date, printr-o singură interogare.
+
+    Și pentru un utilizator din cache se verifică existența contului (poate
+    fi fost șters în alt worker), în aceeași interogare care citește versiunea
+    datelor lui; versiunea rămâne în g pentru request_data_version.
+    """
+    user = user_cache.get(user_id)
+    columns = [User.id] if user is not None else [User.id, User.username, User.email, User.is_admin]
+    row = get_db().query(*columns, UserDataVersion.version).outerjoin(
+        UserDataVersion, UserDataVersion.user_id == User.id
+    ).filter(User.id == user_id).first()
+    if row is None:
+        user_cache.invalidate(user_id)
+        return None
+    g.data_version = row[-1] or 0
+    if user is None:
+        user = CurrentUser(*row[:-1])
+        user_cache.set(user_id, user)
+    return user
+
+def request_data_version(db, user_id):
+    """Versiunea datelor citită deja de login_required în acest request sau, altfel, din baza de date"""
+    version = g.pop('data_version', None)
+    return get_data_version(db, user_id) if version is None else version
+
 # Decorator pentru a verifica dacă utilizatorul este autentificat
 def login_required(f):
     @wraps(f)
@@ -36,20 +136,19 @@ def login_required(f):
         if 'user_id' not in session:
             flash('Vă rugăm să vă autentificați pentru a accesa această pagină.', 'error')
             return redirect(url_for('login'))
-        try:
-            db = SessionLocal()
-            user = db.query(User).get(session['user_id'])
-            if not user:
+        # Utilizatorul se rezolvă o singură dată per request și rămâne în g.user
+        if 'user' not in g:
+            try:
+                g.user = load_current_user(session['user_id'])
+            except Exception as e:
+                print(f"Eroare la verificarea sesiunii: {str(e)}")
                 session.clear()
-                flash('Sesiune invalidă. Vă rugăm să vă autentificați din nou.', 'error')
+                flash('A apărut o eroare. Vă rugăm să vă autentificați din nou.', 'error')
                 return redirect(url_for('login'))
-        except Exception as e:
-            print(f"Eroare la verificarea sesiunii: {str(e)}")
+        if g.user is None:
             session.clear()
-            flash('A apărut o eroare. Vă rugăm să vă autentificați din nou.', 'error')
+            flash('Sesiune invalidă. Vă rugăm să vă autentificați din nou.', 'error')
             return redirect(url_for('login'))
-        finally:
-            db.close()
         return f(*args, **kwargs)
     return decorated_function
 
@@ -62,17 +161,36 @@ def leave_to_dict(leave):
         'description': leave.description
     }
 
-@contextmanager
-def get_db_session():
-    """Context manager pentru gestionarea sesiunilor de bază de date"""
-    db = SessionLocal()
-    try:
-        yield db
-    except Exception as e:
-        db.rollback()
-        raise e
-    finally:
-        db.close()
+def conditional_on_data_version(view):
+    """
+    ETag puternic pentru răspunsurile care depind doar de datele utilizatorului.
+
+    ETag-ul este derivat din (utilizator, versiunea datelor lui, ruta,
+    parametrii cererii). Pentru GET cu If-None-Match egal se răspunde 304
+    după o singură citire din user_data_versions, fără a apela ruta.
+    """
+    @wraps(view)
+    def decorated_function(*args, **kwargs):
+        user_id = session['user_id']
+        version = request_data_version(get_db(), user_id)
+        params = sorted(request.values.items(multi=True))
+        etag = hashlib.sha1(
+            json.dumps([user_id, version, request.path, params]).encode('utf-8')
+        ).hexdigest()
+        
+        if request.method in ('GET', 'HEAD') and request.if_none_match.contains(etag):
+            response = Response(status=304)
+            metrics.record_conditional(not_modified=True)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            metrics.record_conditional(not_modified=False)
+        response.set_etag(etag)
+        # Browserul poate păstra răspunsul, dar îl revalidează la fiecare cerere
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return decorated_function
 
 def check_session():
     """Verifică dacă sesiunea este validă"""
@@ -80,88 +198,112 @@ def check_session():
         raise Exception('Sesiune expirată')
     return session['user_id']
 
+REPORT_DETAIL_MODES = ('none', 'page', 'all')
+
+def build_report(db, filters, group_by=('client', 'project'), detail='none'):
+    """
+    Raportul în forma așteptată de pagina de rapoarte (clients/projects).
+
+    `detail` decide ce activități însoțesc totalurile: 'none' niciuna, 'page'
+    prima pagină plus next_cursor pentru /api/activities, 'all' toate.
+    `filters` este întors și el, ca pagina să poată cere restul activităților.
+    """
+    report = run_report(db, filters, group_by=group_by)
+    breakdowns = report.pop('breakdowns')
+    report['clients'] = breakdowns.get('client', {})
+    report['projects'] = breakdowns.get('project', {})
+    report['filters'] = {
+        name: value.isoformat() if isinstance(value, date) else value
+        for name, value in filters.items() if name != 'user_ids'
+    }
+    if detail == 'page':
+        report['activities'], report['next_cursor'] = page_activities(db, filters, ACTIVITY_PAGE_SIZE)
+    elif detail == 'all':
+        report['activities'] = list_activities(db, filters)
+    return report
+
+def report_detail():
+    """Modul de detaliu cerut (detail=none|page|all, implicit none)"""
+    detail = request.values.get('detail', 'none')
+    if detail not in REPORT_DETAIL_MODES:
+        raise ValueError(f"detail trebuie să fie unul dintre: {', '.join(REPORT_DETAIL_MODES)}")
+    return detail
+
+def load_dashboard(db, user_id, today):
+    """
+    Toate cifrele de pe dashboard dintr-o singură interogare cu agregări
+    condiționate pe rollup, plus ultimele 10 activități ca proiecție simplă.
+    """
+    # Calculăm data de început a săptămânii curente și trecute
+    start_of_week = today - timedelta(days=today.weekday())
+    start_of_last_week = start_of_week - timedelta(days=7)
+    start_of_month = today.replace(day=1)
+    
+    rollup = ActivityDailyRollup
+    in_current_week = and_(rollup.date >= start_of_week, rollup.date <= today)
+    in_last_week = and_(rollup.date >= start_of_last_week, rollup.date < start_of_week)
+    in_current_month = and_(rollup.date >= start_of_month, rollup.date <= today)
+    
+    current_week_hours, last_week_hours, working_days, active_projects, active_clients = db.query(
+        func.coalesce(func.sum(case((in_current_week, rollup.hours), else_=0)), 0),
+        func.coalesce(func.sum(case((in_last_week, rollup.hours), else_=0)), 0),
+        func.count(func.distinct(case((in_current_week, rollup.date)))),
+        func.count(func.distinct(case((in_current_month, rollup.project)))),
+        func.count(func.distinct(case((in_current_month, rollup.client))))
+    ).filter(
+        rollup.user_id == user_id,
+        rollup.date >= min(start_of_last_week, start_of_month),
+        rollup.date <= today
+    ).one()
+    
+    # Activități recente pentru tabel, fără textele lungi (realizări/provocări)
+    recent_activities = db.query(
+        Activity.id,
+        Activity.date,
+        Activity.client,
+        Activity.project,
+        Activity.activity_type,
+        Activity.hours
+    ).filter(
+        Activity.user_id == user_id
+    ).order_by(Activity.date.desc()).limit(10).all()
+    
+    # Calculăm diferența procentuală
+    if last_week_hours > 0:
+        percentage_change = ((current_week_hours - last_week_hours) / last_week_hours) * 100
+    else:
+        percentage_change = 100 if current_week_hours > 0 else 0
+    
+    return {
+        'current_week_hours': current_week_hours,
+        'last_week_hours': last_week_hours,
+        'percentage_change': abs(round(percentage_change, 1)),
+        # Determinăm direcția schimbării (creștere sau scădere)
+        'trend_direction': 'up' if percentage_change >= 0 else 'down',
+        'working_days': working_days,
+        'active_projects': active_projects,
+        'active_clients': active_clients,
+        'recent_activities': recent_activities
+    }
+
 @app.route('/')
 @login_required
 def index():
     try:
-        db = SessionLocal()
-        try:
-            # Get user info
-            user = db.query(User).get(session['user_id'])
-            if not user:
-                return redirect(url_for('logout'))
-            
-            # Calculăm data de început a săptămânii curente și trecute
-            today = datetime.now()
-            start_of_week = today - timedelta(days=today.weekday())
-            start_of_last_week = start_of_week - timedelta(days=7)
-            start_of_month = today.replace(day=1)
-            
-            # Activități pentru săptămâna curentă
-            current_week_activities = db.query(Activity).filter(
-                Activity.user_id == session['user_id'],
-                Activity.date >= start_of_week,
-                Activity.date <= today
-            ).all()
-            
-            # Activități pentru săptămâna trecută
-            last_week_activities = db.query(Activity).filter(
-                Activity.user_id == session['user_id'],
-                Activity.date >= start_of_last_week,
-                Activity.date < start_of_week
-            ).all()
-            
-            # Activități recente pentru tabel
-            recent_activities = db.query(Activity).filter(
-                Activity.user_id == session['user_id']
-            ).order_by(Activity.date.desc()).limit(10).all()
-            
-            # Calculăm totalul orelor pentru săptămâna curentă și precedentă
-            current_week_hours = sum(activity.hours for activity in current_week_activities)
-            last_week_hours = sum(activity.hours for activity in last_week_activities)
-            
-            # Calculăm diferența procentuală
-            if last_week_hours > 0:
-                percentage_change = ((current_week_hours - last_week_hours) / last_week_hours) * 100
-            else:
-                percentage_change = 100 if current_week_hours > 0 else 0
-            
-            # Determinăm direcția schimbării (creștere sau scădere)
-            trend_direction = 'up' if percentage_change >= 0 else 'down'
-            
-            # Calculăm zilele lucrate în săptămâna curentă
-            working_days = len(set(activity.date for activity in current_week_activities))
-            
-            # Calculăm proiecte și clienți activi pentru luna curentă
-            active_projects = db.query(Activity.project).filter(
-                Activity.user_id == session['user_id'],
-                Activity.date >= start_of_month
-            ).distinct().count()
-            
-            active_clients = db.query(Activity.client).filter(
-                Activity.user_id == session['user_id'],
-                Activity.date >= start_of_month
-            ).distinct().count()
-            
-            return render_template('index.html',
-                                username=user.username,
-                                current_week_activities=current_week_activities,
-                                last_week_activities=last_week_activities,
-                                current_week_hours=current_week_hours,
-                                last_week_hours=last_week_hours,
-                                percentage_change=abs(round(percentage_change, 1)),
-                                trend_direction=trend_direction,
-                                working_days=working_days,
-                                active_projects=active_projects,
-                                active_clients=active_clients,
-                                recent_activities=recent_activities)
-        except Exception as e:
-            print(f"Eroare la încărcarea datelor: {str(e)}")
-            db.rollback()
-            raise
-        finally:
-            db.close()
+        db = get_db()
+        user = g.user
+        
+        # Păstrăm și ziua calculului, ca săptămâna/luna să se schimbe la miezul nopții
+        today = date.today()
+        version = request_data_version(db, user.id)
+        cached = dashboard_cache.get(user.id)
+        if cached is None or cached[:2] != (today, version):
+            cached = (today, version, load_dashboard(db, user.id, today))
+            dashboard_cache.set(user.id, cached)
+        
+        return render_template('index.html', username=user.username, **cached[2])
     except Exception as e:
+        print(f"Eroare la încărcarea datelor: {str(e)}")
         flash('A apărut o eroare la încărcarea datelor. Vă rugăm să încercați din nou.', 'error')
         return redirect(url_for('login'))
 
@@ -172,20 +314,14 @@ def login():
             username = request.form['username']
             password = request.form['password']
             
-            db = SessionLocal()
-            try:
-                user = db.query(User).filter(User.username == username).first()
-                
-                if user and check_password_hash(user.password, password):
-                    session['user_id'] = user.id
-                    return redirect(url_for('index'))
-                else:
-                    flash('Nume de utilizator sau parolă invalidă', 'error')
-            except Exception as e:
-                db.rollback()
-                raise e
-            finally:
-                db.close()
+            db = get_db()
+            user = db.query(User).filter(User.username == username).first()
+            
+            if user and verify_password(user.password, password):
+                session['user_id'] = user.id
+                return redirect(url_for('index'))
+            else:
+                flash('Nume de utilizator sau parolă invalidă', 'error')
         except Exception as e:
             print(f"Eroare la autentificare: {str(e)}")
             flash('A apărut o eroare la autentificare. Vă rugăm să încercați din nou.', 'error')
@@ -198,14 +334,14 @@ def register():
         username = request.form['username']
         password = request.form['password']
         
-        db = SessionLocal()
+        db = get_db()
         if db.query(User).filter(User.username == username).first():
             flash('Username already exists', 'error')
             return redirect(url_for('register'))
         
         new_user = User(
             username=username,
-            password=generate_password_hash(password)
+            password=hash_password(password)
         )
         db.add(new_user)
         db.commit()
@@ -225,125 +361,246 @@ def logout():
 def add_activity():
     if request.method == 'GET':
         try:
-            db = SessionLocal()
-            user = db.query(User).get(session['user_id'])
             return render_template('add_activity.html', 
-                                current_user_id=session['user_id'],
-                                current_username=user.username)
+                                current_user_id=g.user.id,
+                                current_username=g.user.username)
         except Exception as e:
             flash('Eroare la încărcarea paginii', 'error')
             return redirect(url_for('index'))
-        finally:
-            db.close()
     else:
         try:
-            db = SessionLocal()
-            try:
-                user_id = session['user_id']
-                data = request.form
-                
-                new_activity = Activity(
-                    user_id=user_id,
-                    date=datetime.strptime(data['date'], '%Y-%m-%d').date(),
-                    client=data['client'],
-                    project=data['project'],
-                    activity_type=data['activity_type'],
-                    achievements=data['achievements'],
-                    challenges=data['challenges'],
-                    hours=float(data['hours'])
-                )
-                
-                db.add(new_activity)
-                db.commit()
-                
-                flash('Activitate adăugată cu succes!', 'success')
-                return redirect(url_for('index'))
-            except Exception as e:
-                db.rollback()
-                raise e
-            finally:
-                db.close()
+            db = get_db()
+            user_id = session['user_id']
+            data = request.form
+            
+            new_activity = Activity(
+                user_id=user_id,
+                date=datetime.strptime(data['date'], '%Y-%m-%d').date(),
+                client=data['client'],
+                project=data['project'],
+                activity_type=data['activity_type'],
+                achievements=data['achievements'],
+                challenges=data['challenges'],
+                hours=float(data['hours'])
+            )
+            
+            db.add(new_activity)
+            record_activity(db, new_activity)
+            bump_data_version(db, [user_id])
+            db.commit()
+            dashboard_cache.invalidate(user_id)
+            
+            flash('Activitate adăugată cu succes!', 'success')
+            return redirect(url_for('index'))
         except Exception as e:
             print(f"Eroare la adăugarea activității: {str(e)}")
             flash('Eroare la adăugarea activității: ' + str(e), 'error')
             return redirect(url_for('add_activity'))
 
+def activity_list_params():
+    """
+    Filtrele, mărimea paginii și câmpurile cerute pentru o listare de activități.
+    Ridică ValueError cu un mesaj pentru utilizator dacă un parametru este invalid.
+    """
+    filters = {'user_ids': [session['user_id']]}
+    for name in ('start_date', 'end_date'):
+        if request.values.get(name):
+            try:
+                filters[name] = datetime.strptime(request.values[name], '%Y-%m-%d').date()
+            except ValueError:
+                raise ValueError(f'{name} trebuie să fie în formatul YYYY-MM-DD')
+    for name in ('client', 'project', 'activity_type'):
+        if request.values.get(name):
+            filters[name] = request.values[name]
+    
+    try:
+        limit = int(request.values.get('limit', ACTIVITY_PAGE_SIZE))
+    except ValueError:
+        raise ValueError('limit trebuie să fie un număr')
+    limit = max(1, min(limit, MAX_ACTIVITY_PAGE_SIZE))
+    
+    fields = ACTIVITY_FIELDS
+    if 'fields' in request.values:
+        fields = tuple(field.strip() for field in request.values['fields'].split(',') if field.strip())
+        if not fields:
+            raise ValueError('fields trebuie să conțină cel puțin un câmp')
+        unknown = [field for field in fields if field not in ACTIVITY_FIELDS]
+        if unknown:
+            raise ValueError(f"Câmpuri necunoscute: {', '.join(unknown)}")
+    return filters, limit, fields
+
+@app.route('/api/activities', methods=['GET'])
+@login_required
+@conditional_on_data_version
+def get_activities():
+    """
+    Activitățile utilizatorului, paginate: cele mai recente primele, câte
+    `limit` pe pagină. Pagina următoare se cere cu cursor=<next_cursor>.
+    Filtre: start_date, end_date, client, project, activity_type;
+    fields=date,client,hours limitează câmpurile întoarse.
+    """
+    try:
+        filters, limit, fields = activity_list_params()
+        activities, next_cursor = page_activities(
+            get_db(), filters, limit, cursor=request.args.get('cursor') or None, fields=fields
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Eroare la listarea activităților: {str(e)}")
+        return jsonify({'error': 'A apărut o eroare la încărcarea activităților'}), 500
+    return jsonify({'activities': activities, 'next_cursor': next_cursor})
+
+@app.route('/api/activities/bulk', methods=['POST'])
+@login_required
+def bulk_add_activities():
+    """
+    Adaugă activități în masă dintr-un array JSON sau dintr-un flux NDJSON
+    (Content-Type: application/x-ndjson, câte un obiect pe linie).
+    Răspunsul conține numărul de rânduri inserate și erorile pe rând.
+    """
+    try:
+        db = get_db()
+        user_id = session['user_id']
+        
+        if request.mimetype in NDJSON_MIMETYPES:
+            # NDJSON este citit linie cu linie, fără a încărca tot corpul în memorie
+            records = iter_ndjson(request.stream)
+        else:
+            data = request.get_json(silent=True)
+            if not isinstance(data, list):
+                return jsonify({'error': 'Se așteaptă un array JSON de activități sau NDJSON'}), 400
+            records = enumerate(data, 1)
+        
+        result = import_activities(db, user_id, records)
+        if result['inserted']:
+            dashboard_cache.invalidate(user_id)
+        return jsonify(result)
+    except Exception as e:
+        print(f"Eroare la importul activităților: {str(e)}")
+        return jsonify({'error': 'A apărut o eroare la importul activităților'}), 500
+
+@app.route('/import_data', methods=['POST'])
+@login_required
+def import_data():
+    """
+    Importă activități dintr-un fișier CSV sau Excel în formatul exportului
+    (coloanele Data, Client, Proiect, Tip Activitate, Ore, Realizări, Provocări).
+
+    Cu ?progress=1 răspunsul este NDJSON: câte o linie {"progress": ...} după
+    fiecare lot salvat și o linie finală {"result": ...}.
+    """
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return jsonify({'error': 'Nu a fost trimis niciun fișier'}), 400
+    
+    extension = os.path.splitext(upload.filename)[1].lower()
+    try:
+        if extension == '.csv':
+            records = csv_records(upload.stream)
+        elif extension == '.xlsx':
+            records = xlsx_records(upload.stream)
+        else:
+            return jsonify({'error': 'Sunt acceptate doar fișiere .csv și .xlsx'}), 400
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    db = get_db()
+    user_id = session['user_id']
+    
+    if request.args.get('progress') != '1':
+        try:
+            result = import_activities(db, user_id, records)
+        except Exception as e:
+            print(f"Eroare la importul fișierului: {str(e)}")
+            return jsonify({'error': 'A apărut o eroare la importul fișierului'}), 500
+        if result['inserted']:
+            dashboard_cache.invalidate(user_id)
+        return jsonify(result)
+    
+    def generate():
+        result = None
+        try:
+            for result in iter_import(db, user_id, records):
+                yield json.dumps({'progress': {key: result[key] for key in ('processed', 'inserted', 'error_count')}}) + '\n'
+        except Exception as e:
+            print(f"Eroare la importul fișierului: {str(e)}")
+            yield json.dumps({'error': 'A apărut o eroare la importul fișierului'}) + '\n'
+        finally:
+            if result is not None and result['inserted']:
+                dashboard_cache.invalidate(user_id)
+        if result is not None:
+            yield json.dumps({'result': result}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @app.route('/leaves')
 @login_required
 def leaves():
     try:
-        db = SessionLocal()
         return render_template('leaves.html')
     except Exception as e:
         flash('Eroare la încărcarea paginii', 'error')
         return redirect(url_for('index'))
-    finally:
-        db.close()
 
 @app.route('/api/leaves', methods=['GET'])
 @login_required
+@conditional_on_data_version
 def get_leaves():
     try:
-        db = SessionLocal()
+        db = get_db()
         user_id = session['user_id']
         leaves = db.query(Leave).filter(Leave.user_id == user_id).order_by(Leave.start_date.desc()).all()
         return jsonify([leave_to_dict(l) for l in leaves])
     except Exception as e:
         print(f"Error getting leaves: {str(e)}")
         return jsonify({'error': 'A apărut o eroare la încărcarea absențelor'}), 500
-    finally:
-        db.close()
 
 @app.route('/api/leaves', methods=['POST'])
 @login_required
 def add_leave():
     try:
-        db = SessionLocal()
-        try:
-            data = request.json
-            if not data:
-                return jsonify({'error': 'Nu s-au primit date'}), 400
+        db = get_db()
+        data = request.json
+        if not data:
+            return jsonify({'error': 'Nu s-au primit date'}), 400
 
-            user_id = session['user_id']
-            
-            # Validăm datele primite
-            required_fields = ['start_date', 'end_date', 'leave_type']
-            for field in required_fields:
-                if field not in data:
-                    return jsonify({'error': f'Câmpul {field} este obligatoriu'}), 400
-            
-            # Convertim string-urile de dată în obiecte date
-            try:
-                start_date = datetime.strptime(data['start_date'], '%Y-%m-%d').date()
-                end_date = datetime.strptime(data['end_date'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({'error': 'Format dată invalid'}), 400
+        user_id = session['user_id']
+        
+        # Validăm datele primite
+        required_fields = ['start_date', 'end_date', 'leave_type']
+        for field in required_fields:
+            if field not in data:
+                return jsonify({'error': f'Câmpul {field} este obligatoriu'}), 400
+        
+        # Convertim string-urile de dată în obiecte date
+        try:
+            start_date = datetime.strptime(data['start_date'], '%Y-%m-%d').date()
+            end_date = datetime.strptime(data['end_date'], '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'error': 'Format dată invalid'}), 400
 
-            # Verificăm ca data de început să fie înainte de data de sfârșit
-            if start_date > end_date:
-                return jsonify({'error': 'Data de început trebuie să fie înainte de data de sfârșit'}), 400
+        # Verificăm ca data de început să fie înainte de data de sfârșit
+        if start_date > end_date:
+            return jsonify({'error': 'Data de început trebuie să fie înainte de data de sfârșit'}), 400
 
-            # Creăm noua absență
-            new_leave = Leave(
-                user_id=user_id,
-                start_date=start_date,
-                end_date=end_date,
-                leave_type=data['leave_type'],
-                description=data.get('description', '')  # câmp opțional
-            )
+        # Creăm noua absență
+        new_leave = Leave(
+            user_id=user_id,
+            start_date=start_date,
+            end_date=end_date,
+            leave_type=data['leave_type'],
+            description=data.get('description', '')  # câmp opțional
+        )
 
-            db.add(new_leave)
-            db.commit()
-            
-            # Returnăm toate absențele actualizate
-            leaves = db.query(Leave).filter(Leave.user_id == user_id).order_by(Leave.start_date.desc()).all()
-            return jsonify([leave_to_dict(l) for l in leaves])
+        db.add(new_leave)
+        bump_data_version(db, [user_id])
+        db.commit()
+        
+        # Returnăm toate absențele actualizate
+        leaves = db.query(Leave).filter(Leave.user_id == user_id).order_by(Leave.start_date.desc()).all()
+        return jsonify([leave_to_dict(l) for l in leaves])
         
-        except Exception as e:
-            db.rollback()
-            raise e
-        finally:
-            db.close()
     except Exception as e:
         print(f"Error adding leave: {str(e)}")
         return jsonify({'error': 'A apărut o eroare la salvarea absenței'}), 500
@@ -352,7 +609,7 @@ def add_leave():
 @login_required
 def delete_leave(leave_id):
     try:
-        db = SessionLocal()
+        db = get_db()
         user_id = session['user_id']
         
         # Verificăm dacă absența există și aparține utilizatorului curent
@@ -361,6 +618,7 @@ def delete_leave(leave_id):
             return jsonify({'error': 'Absența nu a fost găsită'}), 404
             
         db.delete(leave)
+        bump_data_version(db, [user_id])
         db.commit()
         
         # Returnăm toate absențele actualizate
@@ -370,28 +628,24 @@ def delete_leave(leave_id):
     except Exception as e:
         print(f"Error deleting leave: {str(e)}")
         return jsonify({'error': 'A apărut o eroare la ștergerea absenței'}), 500
-    finally:
-        db.close()
 
 @app.route('/expenses')
 @login_required
 def expenses():
     try:
-        db = SessionLocal()
+        db = get_db()
         user_id = session['user_id']
         user_expenses = db.query(Expense).filter(Expense.user_id == user_id).all()
         return render_template('expenses.html', expenses=[expense_to_dict(e) for e in user_expenses])
     except Exception as e:
         flash('Eroare la încărcarea paginii', 'error')
         return redirect(url_for('index'))
-    finally:
-        db.close()
 
 @app.route('/api/expenses/add', methods=['POST'])
 @login_required
 def add_expense():
     try:
-        db = SessionLocal()
+        db = get_db()
         user_id = session['user_id']
         data = request.form
         
@@ -409,122 +663,84 @@ def add_expense():
         )
         
         db.add(new_expense)
+        bump_data_version(db, [user_id])
         db.commit()
         
         return jsonify({'success': True})
     except Exception as e:
         print(f"Error adding expense: {str(e)}")
         return jsonify({'success': False, 'error': str(e)})
-    finally:
-        db.close()
 
 @app.route('/api/expenses')
 @login_required
+@conditional_on_data_version
 def get_expenses():
     try:
-        db = SessionLocal()
+        db = get_db()
         user_id = session['user_id']
         expenses = db.query(Expense).filter(Expense.user_id == user_id).all()
         return jsonify([expense_to_dict(e) for e in expenses])
     except Exception as e:
         print(f"Error getting expenses: {str(e)}")
         return jsonify({'error': 'A apărut o eroare la încărcarea cheltuielilor'}), 500
-    finally:
-        db.close()
 
 @app.route('/api/expenses/<int:expense_id>', methods=['DELETE'])
 @login_required
 def delete_expense(expense_id):
     try:
-        db = SessionLocal()
-        try:
-            expense = db.query(Expense).filter(
-                Expense.id == expense_id,
-                Expense.user_id == session['user_id']
-            ).first()
-            
-            if not expense:
-                return jsonify({'error': 'Cheltuiala nu a fost găsită'}), 404
-            
-            db.delete(expense)
-            db.commit()
-            
-            return jsonify({'message': 'Cheltuiala a fost ștearsă cu succes'})
-        except Exception as e:
-            db.rollback()
-            raise e
-        finally:
-            db.close()
+        db = get_db()
+        expense = db.query(Expense).filter(
+            Expense.id == expense_id,
+            Expense.user_id == session['user_id']
+        ).first()
+        
+        if not expense:
+            return jsonify({'error': 'Cheltuiala nu a fost găsită'}), 404
+        
+        db.delete(expense)
+        bump_data_version(db, [expense.user_id])
+        db.commit()
+        
+        return jsonify({'message': 'Cheltuiala a fost ștearsă cu succes'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def xlsx_response(path, download_name, dataset, started):
+    """Răspuns care trimite fișierul .xlsx temporar și îl șterge după trimitere"""
+    headers = attachment_headers(download_name)
+    headers['Content-Length'] = str(os.path.getsize(path))
+    response = Response(
+        metrics.track_export(iter_file(path), dataset, 'excel', started),
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        headers=headers
+    )
+    # Fișierul este șters și dacă clientul renunță înainte de finalul descărcării
+    response.call_on_close(lambda: remove_file(path))
+    return response
+
 @app.route('/export_data/<type>')
 @login_required
 def export_data(type):
     try:
-        db = SessionLocal()
+        db = get_db()
         user_id = session['user_id']
         
-        # Get user info
-        user = db.query(User).filter(User.id == user_id).first()
-        user_name = user.username if user else "Necunoscut"
+        user_name = g.user.username
+        started = time.perf_counter()
         
         if type == 'excel':
-            # Get all activities for the current user
-            activities = db.query(Activity).filter(Activity.user_id == user_id).all()
-            data = []
-            for activity in activities:
-                data.append({
-                    'Angajat': user_name,
-                    'Data': activity.date,
-                    'Client': activity.client,
-                    'Proiect': activity.project,
-                    'Tip Activitate': activity.activity_type,
-                    'Ore': activity.hours,
-                    'Realizări': activity.achievements,
-                    'Provocări': activity.challenges
-                })
-            df = pd.DataFrame(data)
-            
-            # Create a BytesIO buffer for the Excel file
-            buffer = BytesIO()
-            df.to_excel(buffer, index=False, engine='openpyxl')
-            buffer.seek(0)
-            
-            return send_file(
-                buffer,
-                mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                as_attachment=True,
-                download_name=f'activitati_{user_name}_{datetime.now().strftime("%Y%m%d")}.xlsx'
-            )
+            # Workbook-ul este scris rând cu rând într-un fișier temporar, apoi trimis în bucăți
+            path = write_xlsx(ACTIVITY_COLUMNS, activity_rows(db, user_id, user_name))
+            return xlsx_response(path, f'activitati_{user_name}_{datetime.now().strftime("%Y%m%d")}.xlsx',
+                                 'activities', started)
             
         elif type == 'csv':
-            # Get all activities for the current user
-            activities = db.query(Activity).filter(Activity.user_id == user_id).all()
-            data = []
-            for activity in activities:
-                data.append({
-                    'Angajat': user_name,
-                    'Data': activity.date,
-                    'Client': activity.client,
-                    'Proiect': activity.project,
-                    'Tip Activitate': activity.activity_type,
-                    'Ore': activity.hours,
-                    'Realizări': activity.achievements,
-                    'Provocări': activity.challenges
-                })
-            df = pd.DataFrame(data)
-            
-            # Create a BytesIO buffer for the CSV file
-            buffer = BytesIO()
-            df.to_csv(buffer, index=False, encoding='utf-8')
-            buffer.seek(0)
-            
-            return send_file(
-                buffer,
+            # Fișierul este trimis pe măsură ce rândurile sunt citite din baza de date
+            rows = activity_rows(db, user_id, user_name)
+            return Response(
+                stream_with_context(metrics.track_export(iter_csv(ACTIVITY_COLUMNS, rows), 'activities', 'csv', started)),
                 mimetype='text/csv',
-                as_attachment=True,
-                download_name=f'activitati_{user_name}_{datetime.now().strftime("%Y%m%d")}.csv'
+                headers=attachment_headers(f'activitati_{user_name}_{datetime.now().strftime("%Y%m%d")}.csv')
             )
             
         else:
@@ -532,66 +748,40 @@ def export_data(type):
             
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close()
 
 @app.route('/export_expenses/<type>')
 @login_required
 def export_expenses(type):
     try:
-        db = SessionLocal()
+        db = get_db()
         user_id = session['user_id']
         
-        # Get user info
-        user = db.query(User).filter(User.id == user_id).first()
-        user_name = user.username if user else "Necunoscut"
+        user_name = g.user.username
+        started = time.perf_counter()
         
-        # Get all expenses for the current user
-        expenses = db.query(Expense).filter(Expense.user_id == user_id).all()
-        data = []
-        for expense in expenses:
-            data.append({
-                'Angajat': user_name,
-                'Data': expense.date,
-                'Proiect': expense.project,
-                'Categorie': expense.category,
-                'Descriere': expense.description,
-                'Sumă': expense.amount,
-                'Status': expense.status
-            })
-        df = pd.DataFrame(data)
-        
-        buffer = BytesIO()
+        if type == 'csv':
+            rows = expense_rows(db, user_id, user_name)
+            return Response(
+                stream_with_context(metrics.track_export(iter_csv(EXPENSE_COLUMNS, rows), 'expenses', 'csv', started)),
+                mimetype='text/csv',
+                headers=attachment_headers(f'cheltuieli_{user_name}_{datetime.now().strftime("%Y%m%d")}.csv')
+            )
         
         if type == 'excel':
-            df.to_excel(buffer, index=False, engine='openpyxl')
-            mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            extension = 'xlsx'
-        elif type == 'csv':
-            df.to_csv(buffer, index=False, encoding='utf-8')
-            mimetype = 'text/csv'
-            extension = 'csv'
-        else:
-            return jsonify({'error': 'Format invalid'}), 400
-            
-        buffer.seek(0)
-        return send_file(
-            buffer,
-            mimetype=mimetype,
-            as_attachment=True,
-            download_name=f'cheltuieli_{user_name}_{datetime.now().strftime("%Y%m%d")}.{extension}'
-        )
+            path = write_xlsx(EXPENSE_COLUMNS, expense_rows(db, user_id, user_name))
+            return xlsx_response(path, f'cheltuieli_{user_name}_{datetime.now().strftime("%Y%m%d")}.xlsx',
+                                 'expenses', started)
+        
+        return jsonify({'error': 'Format invalid'}), 400
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close()
 
 @app.route('/reports')
 @login_required
 def reports():
     try:
-        db = SessionLocal()
+        db = get_db()
         user_id = session['user_id']
         
         # Get unique clients and projects for dropdowns
@@ -607,9 +797,7 @@ def reports():
             Activity.project != ''
         ).distinct().all()
         
-        # Get current user info
-        user = db.query(User).filter(User.id == user_id).first()
-        employees = [{'user_id': user.id, 'username': user.username}]
+        employees = [{'user_id': g.user.id, 'username': g.user.username}]
         
         return render_template('reports.html',
                              employees=employees,
@@ -619,249 +807,129 @@ def reports():
     except Exception as e:
         flash('Eroare la încărcarea paginii', 'error')
         return redirect(url_for('index'))
-    finally:
-        db.close()
 
-@app.route('/api/report/weekly', methods=['POST'])
+@app.route('/api/report/weekly', methods=['GET', 'POST'])
 @login_required
+@conditional_on_data_version
 def generate_weekly_report():
     try:
-        db = SessionLocal()
+        db = get_db()
         user_id = check_session()
-        start_date = datetime.strptime(request.form['start_date'], '%Y-%m-%d')
+        start_date = datetime.strptime(request.values['start_date'], '%Y-%m-%d').date()
         end_date = start_date + timedelta(days=6)
         
-        activities = db.query(Activity).filter(
-            Activity.user_id == user_id,
-            Activity.date >= start_date,
-            Activity.date <= end_date
-        ).order_by(Activity.date.desc()).all()
-        
-        if not activities:
-            return jsonify({
-                'total_hours': 0,
-                'working_days': 0,
-                'unique_projects': 0,
-                'activities': [],
-                'clients': {},
-                'projects': {}
-            })
-        
-        # Calculăm statisticile
-        total_hours = sum(activity.hours for activity in activities)
-        working_days = len(set(activity.date for activity in activities))
-        unique_projects = len(set(activity.project for activity in activities))
-        
-        # Grupăm orele pe client și proiect
-        clients = {}
-        projects = {}
-        for activity in activities:
-            if activity.client:
-                clients[activity.client] = clients.get(activity.client, 0) + activity.hours
-            if activity.project:
-                projects[activity.project] = projects.get(activity.project, 0) + activity.hours
-        
-        return jsonify({
-            'total_hours': total_hours,
-            'working_days': working_days,
-            'unique_projects': unique_projects,
-            'activities': [activity_to_dict(a) for a in activities],
-            'clients': clients,
-            'projects': projects
-        })
+        report = build_report(
+            db,
+            {'user_ids': [user_id], 'start_date': start_date, 'end_date': end_date},
+            detail=report_detail()
+        )
+        return jsonify(report)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Weekly report error: {str(e)}")
         return jsonify({'error': 'Eroare la generarea raportului săptămânal'}), 500
-    finally:
-        db.close()
 
-@app.route('/api/report/monthly', methods=['POST'])
+@app.route('/api/report/monthly', methods=['GET', 'POST'])
 @login_required
+@conditional_on_data_version
 def generate_monthly_report():
     try:
-        db = SessionLocal()
+        db = get_db()
         user_id = check_session()
-        month_year = request.form['month']  # Format: "YYYY-MM"
+        month_year = request.values['month']  # Format: "YYYY-MM"
         year, month = map(int, month_year.split('-'))
         
-        start_date = datetime(year, month, 1)
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1) - timedelta(days=1)
-        else:
-            end_date = datetime(year, month + 1, 1) - timedelta(days=1)
-        
-        activities = db.query(Activity).filter(
-            Activity.user_id == user_id,
-            Activity.date >= start_date,
-            Activity.date <= end_date
-        ).order_by(Activity.date.desc()).all()
-        
-        if not activities:
-            return jsonify({
-                'total_hours': 0,
-                'working_days': 0,
-                'unique_projects': 0,
-                'activities': [],
-                'clients': {},
-                'projects': {}
-            })
-        
-        # Calculăm statisticile
-        total_hours = sum(activity.hours for activity in activities)
-        working_days = len(set(activity.date for activity in activities))
-        unique_projects = len(set(activity.project for activity in activities))
-        
-        # Grupăm orele pe client și proiect
-        clients = {}
-        projects = {}
-        for activity in activities:
-            if activity.client:
-                clients[activity.client] = clients.get(activity.client, 0) + activity.hours
-            if activity.project:
-                projects[activity.project] = projects.get(activity.project, 0) + activity.hours
+        start_date = date(year, month, 1)
+        end_date = date(year, month, calendar.monthrange(year, month)[1])
         
-        return jsonify({
-            'total_hours': total_hours,
-            'working_days': working_days,
-            'unique_projects': unique_projects,
-            'activities': [activity_to_dict(a) for a in activities],
-            'clients': clients,
-            'projects': projects
-        })
+        report = build_report(
+            db,
+            {'user_ids': [user_id], 'start_date': start_date, 'end_date': end_date},
+            detail=report_detail()
+        )
+        return jsonify(report)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Monthly report error: {str(e)}")
         return jsonify({'error': 'Eroare la generarea raportului lunar'}), 500
-    finally:
-        db.close()
 
-@app.route('/api/report/client', methods=['POST'])
+@app.route('/api/report/client', methods=['GET', 'POST'])
 @login_required
+@conditional_on_data_version
 def generate_client_report():
     try:
-        db = SessionLocal()
+        db = get_db()
         user_id = check_session()
-        client = request.form.get('client')
+        client = request.values.get('client')
         if not client:
             return jsonify({'error': 'Clientul este obligatoriu'}), 400
         
-        activities = db.query(Activity).filter(
-            Activity.user_id == user_id,
-            Activity.client == client
-        ).order_by(Activity.date.desc()).all()
-        
-        if not activities:
-            return jsonify({
-                'total_hours': 0,
-                'working_days': 0,
-                'unique_projects': 0,
-                'activities': [],
-                'clients': {client: 0},
-                'projects': {}
-            })
-        
-        # Calculăm statisticile
-        total_hours = sum(activity.hours for activity in activities)
-        working_days = len(set(activity.date for activity in activities))
-        unique_projects = len(set(activity.project for activity in activities))
-        
-        # Grupăm orele pe proiect
-        projects = {}
-        for activity in activities:
-            if activity.project:
-                projects[activity.project] = projects.get(activity.project, 0) + activity.hours
-        
-        return jsonify({
-            'total_hours': total_hours,
-            'working_days': working_days,
-            'unique_projects': unique_projects,
-            'activities': [activity_to_dict(a) for a in activities],
-            'clients': {client: total_hours},
-            'projects': projects
-        })
+        report = build_report(
+            db,
+            {'user_ids': [user_id], 'client': client},
+            group_by=('project',),
+            detail=report_detail()
+        )
+        report['clients'] = {client: report['total_hours']}
+        return jsonify(report)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Client report error: {str(e)}")
         return jsonify({'error': 'Eroare la generarea raportului pe client'}), 500
-    finally:
-        db.close()
 
-@app.route('/api/report/project', methods=['POST'])
+@app.route('/api/report/project', methods=['GET', 'POST'])
 @login_required
+@conditional_on_data_version
 def generate_project_report():
     try:
-        db = SessionLocal()
+        db = get_db()
         user_id = check_session()
-        project = request.form.get('project')
+        project = request.values.get('project')
         if not project:
             return jsonify({'error': 'Proiectul este obligatoriu'}), 400
         
-        activities = db.query(Activity).filter(
-            Activity.user_id == user_id,
-            Activity.project == project
-        ).order_by(Activity.date.desc()).all()
-        
-        if not activities:
-            return jsonify({
-                'total_hours': 0,
-                'working_days': 0,
-                'unique_projects': 1,
-                'activities': [],
-                'clients': {},
-                'projects': {project: 0}
-            })
-        
-        # Calculăm statisticile
-        total_hours = sum(activity.hours for activity in activities)
-        working_days = len(set(activity.date for activity in activities))
-        
-        # Grupăm orele pe client
-        clients = {}
-        for activity in activities:
-            if activity.client:
-                clients[activity.client] = clients.get(activity.client, 0) + activity.hours
-        
-        return jsonify({
-            'total_hours': total_hours,
-            'working_days': working_days,
-            'unique_projects': 1,
-            'activities': [activity_to_dict(a) for a in activities],
-            'clients': clients,
-            'projects': {project: total_hours}
-        })
+        report = build_report(
+            db,
+            {'user_ids': [user_id], 'project': project},
+            group_by=('client',),
+            detail=report_detail()
+        )
+        report['unique_projects'] = 1
+        report['projects'] = {project: report['total_hours']}
+        return jsonify(report)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Project report error: {str(e)}")
         return jsonify({'error': 'Eroare la generarea raportului pe proiect'}), 500
-    finally:
-        db.close()
 
 @app.route('/api/activity/<int:activity_id>', methods=['GET'])
 @login_required
+@conditional_on_data_version
 def get_activity(activity_id):
     try:
-        db = SessionLocal()
-        try:
-            activity = db.query(Activity).filter(
-                Activity.id == activity_id,
-                Activity.user_id == session['user_id']
-            ).first()
+        db = get_db()
+        activity = db.query(Activity).filter(
+            Activity.id == activity_id,
+            Activity.user_id == session['user_id']
+        ).first()
+        
+        if not activity:
+            return jsonify({'error': 'Activitatea nu a fost găsită'}), 404
             
-            if not activity:
-                return jsonify({'error': 'Activitatea nu a fost găsită'}), 404
-                
-            return jsonify({
-                'id': activity.id,
-                'date': activity.date.strftime('%Y-%m-%d'),
-                'client': activity.client,
-                'project': activity.project,
-                'activity_type': activity.activity_type,
-                'hours': activity.hours,
-                'achievements': activity.achievements,
-                'challenges': activity.challenges
-            })
-        except Exception as e:
-            db.rollback()
-            raise e
-        finally:
-            db.close()
+        return jsonify({
+            'id': activity.id,
+            'date': activity.date.strftime('%Y-%m-%d'),
+            'client': activity.client,
+            'project': activity.project,
+            'activity_type': activity.activity_type,
+            'hours': activity.hours,
+            'achievements': activity.achievements,
+            'challenges': activity.challenges
+        })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -869,25 +937,22 @@ def get_activity(activity_id):
 @login_required
 def delete_activity(activity_id):
     try:
-        db = SessionLocal()
-        try:
-            activity = db.query(Activity).filter(
-                Activity.id == activity_id,
-                Activity.user_id == session['user_id']
-            ).first()
-            
-            if not activity:
-                return jsonify({'error': 'Activitatea nu a fost găsită'}), 404
-            
-            db.delete(activity)
-            db.commit()
-            
-            return jsonify({'message': 'Activitatea a fost ștearsă cu succes'})
-        except Exception as e:
-            db.rollback()
-            raise e
-        finally:
-            db.close()
+        db = get_db()
+        activity = db.query(Activity).filter(
+            Activity.id == activity_id,
+            Activity.user_id == session['user_id']
+        ).first()
+        
+        if not activity:
+            return jsonify({'error': 'Activitatea nu a fost găsită'}), 404
+        
+        record_activity(db, activity, sign=-1)
+        bump_data_version(db, [activity.user_id])
+        db.delete(activity)
+        db.commit()
+        dashboard_cache.invalidate(session['user_id'])
+        
+        return jsonify({'message': 'Activitatea a fost ștearsă cu succes'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -895,18 +960,11 @@ def delete_activity(activity_id):
 @login_required
 def profile():
     try:
-        db = SessionLocal()
-        user = db.query(User).get(session['user_id'])
-        if user is None:
-            flash('Utilizator negăsit.', 'error')
-            return redirect(url_for('logout'))
-        return render_template('profile.html', current_user=user)
+        return render_template('profile.html', current_user=g.user)
     except Exception as e:
         print(f"Eroare la încărcarea profilului: {str(e)}")
         flash('A apărut o eroare la încărcarea profilului.', 'error')
         return redirect(url_for('index'))
-    finally:
-        db.close()
 
 @app.route('/update_password', methods=['POST'])
 @login_required
@@ -924,24 +982,21 @@ def update_password():
             flash('Parolele noi nu se potrivesc.', 'error')
             return redirect(url_for('profile'))
             
-        db = SessionLocal()
-        try:
-            user = db.query(User).get(session['user_id'])
-            if not user:
-                flash('Utilizator negăsit.', 'error')
-                return redirect(url_for('logout'))
-                
-            if not check_password_hash(user.password, current_password):
-                flash('Parola curentă este incorectă.', 'error')
-                return redirect(url_for('profile'))
-                
-            user.password = generate_password_hash(new_password)
-            db.commit()
-            flash('Parola a fost actualizată cu succes!', 'success')
+        db = get_db()
+        user = db.query(User).get(session['user_id'])
+        if not user:
+            flash('Utilizator negăsit.', 'error')
+            return redirect(url_for('logout'))
+            
+        if not verify_password(user.password, current_password):
+            flash('Parola curentă este incorectă.', 'error')
             return redirect(url_for('profile'))
             
-        finally:
-            db.close()
+        user.password = hash_password(new_password)
+        db.commit()
+        user_cache.invalidate(user.id)
+        flash('Parola a fost actualizată cu succes!', 'success')
+        return redirect(url_for('profile'))
             
     except Exception as e:
         print(f"Eroare la actualizarea parolei: {str(e)}")
@@ -952,20 +1007,23 @@ def update_password():
 @login_required
 def delete_account():
     try:
-        db = SessionLocal()
-        try:
-            user = db.query(User).get(session['user_id'])
-            if user:
-                db.delete(user)
-                db.commit()
-                session.clear()
-                flash('Contul tău a fost șters cu succes.', 'success')
-                return redirect(url_for('login'))
-            else:
-                flash('Utilizator negăsit.', 'error')
-                return redirect(url_for('profile'))
-        finally:
-            db.close()
+        db = get_db()
+        user = db.query(User).get(session['user_id'])
+        if user:
+            # Rândurile derivate (rollup, versiunea datelor) nu au relații ORM
+            # care să le trateze, iar cheile lor străine ar bloca ștergerea
+            db.query(ActivityDailyRollup).filter(ActivityDailyRollup.user_id == user.id).delete(synchronize_session=False)
+            db.query(UserDataVersion).filter(UserDataVersion.user_id == user.id).delete(synchronize_session=False)
+            db.delete(user)
+            db.commit()
+            user_cache.invalidate(user.id)
+            dashboard_cache.invalidate(user.id)
+            session.clear()
+            flash('Contul tău a fost șters cu succes.', 'success')
+            return redirect(url_for('login'))
+        else:
+            flash('Utilizator negăsit.', 'error')
+            return redirect(url_for('profile'))
     except Exception as e:
         print(f"Eroare la ștergerea contului: {str(e)}")
         flash('A apărut o eroare la ștergerea contului.', 'error')
@@ -0,0 +1,122 @@
+"""
+Benchmark pentru exportul Excel: calea veche (pandas) vs. workbook write-only
+
+Fiecare variantă rulează într-un proces separat, ca vârful de memorie (RSS)
+măsurat să îi aparțină doar ei. Rândurile sunt sintetice, în formatul
+exportului de activități, deci nu este nevoie de o bază de date.
+
+Utilizare:
+    python benchmarks/bench_exports.py                 # 100000 rânduri
+    python benchmarks/bench_exports.py --rows 250000
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Benchmark-ul nu atinge baza de date, dar models/database o configurează la import
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+def peak_rss_mb():
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux raportează în KB, macOS în bytes
+    return usage / (1024 * 1024) if sys.platform == 'darwin' else usage / 1024
+
+def synthetic_rows(count):
+    start = date(2020, 1, 1)
+    for i in range(count):
+        yield [
+            'angajat',
+            start + timedelta(days=i // 4),
+            f'Client {i % 40}',
+            f'Proiect {i % 120}',
+            'Programare',
+            1.5 + (i % 6),
+            'Realizări: ' + 'implementare și testare funcționalitate ' * 4,
+            'Provocări: ' + 'cerințe neclare de la client ' * 3,
+        ]
+
+def run_pandas(rows):
+    """Calea de export de dinainte: listă de dicționare -> DataFrame -> to_excel în memorie"""
+    from io import BytesIO
+    import pandas as pd
+    from exports import ACTIVITY_COLUMNS
+
+    data = [dict(zip(ACTIVITY_COLUMNS, row)) for row in synthetic_rows(rows)]
+    df = pd.DataFrame(data)
+    buffer = BytesIO()
+    df.to_excel(buffer, index=False, engine='openpyxl')
+    return buffer.getbuffer().nbytes
+
+def run_write_only(rows):
+    from exports import ACTIVITY_COLUMNS, write_xlsx
+
+    path = write_xlsx(ACTIVITY_COLUMNS, synthetic_rows(rows))
+    try:
+        return os.path.getsize(path)
+    finally:
+        os.remove(path)
+
+VARIANTS = {
+    'pandas': run_pandas,
+    'write_only': run_write_only,
+}
+
+def run_variant(name, rows):
+    """Rulează o variantă în procesul curent și afișează rezultatul ca JSON"""
+    import exports  # noqa: F401 - importurile nu intră în timpul măsurat
+    if name == 'pandas':
+        import pandas  # noqa: F401
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    size = VARIANTS[name](rows)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        'variant': name,
+        'rows': rows,
+        'seconds': round(elapsed, 3),
+        'baseline_rss_mb': round(baseline, 1),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'file_bytes': size,
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--variant', choices=sorted(VARIANTS), help=argparse.SUPPRESS)
+    parser.add_argument('--output', help='Fișier JSON în care se salvează rezultatele')
+    args = parser.parse_args()
+
+    if args.variant:
+        run_variant(args.variant, args.rows)
+        return
+
+    results = []
+    for name in VARIANTS:
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--variant', name, '--rows', str(args.rows)],
+            capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            print(f'{name}: eșuat\n{completed.stderr.strip()}')
+            continue
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        results.append(result)
+        print(f"{name:>10}: {result['seconds']:8.2f} s  "
+              f"RSS vârf {result['peak_rss_mb']:8.1f} MB "
+              f"(+{result['peak_rss_mb'] - result['baseline_rss_mb']:.1f} MB peste importuri)  "
+              f"{result['file_bytes'] / 1024 / 1024:.1f} MB xlsx")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+"""
+Latența rutelor aplicației, prin clientul de test Flask
+
+Rulează fiecare rută de --requests ori, ca un utilizator autentificat din
+datele create de generate_data.py, și raportează per rută:
+  - latența p50/p95/p99 (inclusiv citirea întregului răspuns, deci și partea
+    trimisă treptat a exporturilor);
+  - numărul de interogări SQL per request (numărate pe engine, deci și cele
+    făcute în timpul trimiterii unui export);
+  - vârful memoriei alocate de Python într-un request (tracemalloc, într-o
+    trecere separată, ca să nu încetinească măsurarea latenței);
+  - mărimea răspunsului.
+
+Cache-urile din memorie (dashboard, utilizator) funcționează ca în producție;
+cu --cold sunt dezactivate, ca fiecare request să facă toate calculele.
+ETag-urile nu sunt trimise înapoi, deci răspunsurile sunt complete.
+
+Rezultatele sunt scrise ca JSON; cu --compare sunt afișate și diferențele
+față de o rulare anterioară.
+
+Utilizare:
+    python benchmarks/generate_data.py
+    python benchmarks/bench_routes.py --output rezultate.json
+    python benchmarks/bench_routes.py --compare rezultate.json --only report
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from generate_data import DEFAULT_DATABASE_URL, DEFAULT_PASSWORD, USERNAME_FORMAT  # noqa: E402
+
+def routes(today, client, project):
+    """(nume, metodă, URL, date formular) pentru fiecare rută măsurată"""
+    monday = today - timedelta(days=today.weekday())
+    return [
+        ('index', 'GET', '/', None),
+        ('reports_page', 'GET', '/reports', None),
+        ('report_weekly', 'POST', '/api/report/weekly', {'start_date': monday.isoformat()}),
+        ('report_monthly', 'POST', '/api/report/monthly', {'month': today.strftime('%Y-%m')}),
+        ('report_client', 'POST', '/api/report/client', {'client': client}),
+        ('report_client_page', 'POST', '/api/report/client', {'client': client, 'detail': 'page'}),
+        ('report_project', 'POST', '/api/report/project', {'project': project}),
+        ('activities_page', 'GET', '/api/activities', None),
+        ('leaves', 'GET', '/api/leaves', None),
+        ('expenses', 'GET', '/api/expenses', None),
+        ('export_activities_csv', 'GET', '/export_data/csv', None),
+        ('export_activities_excel', 'GET', '/export_data/excel', None),
+        ('export_expenses_csv', 'GET', '/export_expenses/csv', None),
+        ('export_expenses_excel', 'GET', '/export_expenses/excel', None),
+    ]
+
+def percentile(sorted_values, fraction):
+    """Percentila prin metoda rangului cel mai apropiat"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+def peak_rss_mb():
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux raportează în KB, macOS în bytes
+    return usage / (1024 * 1024) if sys.platform == 'darwin' else usage / 1024
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', default=os.environ.get('BENCH_DATABASE_URL', DEFAULT_DATABASE_URL))
+    parser.add_argument('--user', default=USERNAME_FORMAT.format(1))
+    parser.add_argument('--password', default=DEFAULT_PASSWORD)
+    parser.add_argument('--requests', type=int, default=30, help='Câte request-uri măsurate pe rută')
+    parser.add_argument('--warmup', type=int, default=2, help='Câte request-uri nemăsurate înainte')
+    parser.add_argument('--only', help='Doar rutele al căror nume conține acest text')
+    parser.add_argument('--cold', action='store_true', help='Dezactivează cache-urile din memorie')
+    parser.add_argument('--output', help='Fișier JSON în care se salvează rezultatele')
+    parser.add_argument('--compare', help='Rezultatele unei rulări anterioare (JSON), pentru comparație')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    os.environ['DATABASE_URL'] = args.database_url
+    # Măsurăm rutele, nu jurnalele de diagnostic
+    os.environ.setdefault('SLOW_QUERY_MS', 'off')
+    if args.cold:
+        os.environ['DASHBOARD_CACHE_TTL'] = '0'
+        os.environ['USER_CACHE_TTL'] = '0'
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+
+    import logging
+    from sqlalchemy import event, func
+    import app as app_module
+    from database import engine, SessionLocal
+    from models import Activity, User
+
+    # Log-ul JSON per request ar încetini și ar umple ieșirea
+    logging.getLogger('worktracker.requests').setLevel(logging.WARNING)
+
+    db = SessionLocal()
+    try:
+        user_id = db.query(User.id).filter(User.username == args.user).scalar()
+        if user_id is None:
+            raise SystemExit(f'Utilizatorul {args.user!r} nu există; rulați întâi benchmarks/generate_data.py')
+        activity_count = db.query(func.count(Activity.id)).filter(Activity.user_id == user_id).scalar()
+        total_activities = db.query(func.count(Activity.id)).scalar()
+        client, project = db.query(Activity.client, Activity.project).filter(
+            Activity.user_id == user_id).group_by(Activity.client, Activity.project).order_by(
+            func.count().desc()).first() or ('', '')
+    finally:
+        db.close()
+
+    client_app = app_module.app.test_client()
+    response = client_app.post('/login', data={'username': args.user, 'password': args.password})
+    if response.status_code != 302 or response.headers.get('Location', '').endswith('/login'):
+        raise SystemExit('Autentificarea a eșuat; verificați --user și --password')
+
+    queries = [0]
+
+    def count_query(*_):
+        queries[0] += 1
+    event.listen(engine, 'before_cursor_execute', count_query)
+
+    def run(method, url, data):
+        response = client_app.open(url, method=method, data=data)
+        body = response.get_data()
+        response.close()
+        return response.status_code, len(body)
+
+    results = {}
+    for name, method, url, data in routes(date.today(), client, project):
+        if args.only and args.only not in name:
+            continue
+        for _ in range(args.warmup):
+            run(method, url, data)
+
+        durations = []
+        query_counts = []
+        statuses = {}
+        size = 0
+        for _ in range(args.requests):
+            queries[0] = 0
+            started = time.perf_counter()
+            status, size = run(method, url, data)
+            durations.append((time.perf_counter() - started) * 1000)
+            query_counts.append(queries[0])
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+        tracemalloc.start()
+        run(method, url, data)
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        durations.sort()
+        results[name] = {
+            'method': method,
+            'url': url,
+            'requests': len(durations),
+            'statuses': statuses,
+            'p50_ms': round(percentile(durations, 0.50), 2),
+            'p95_ms': round(percentile(durations, 0.95), 2),
+            'p99_ms': round(percentile(durations, 0.99), 2),
+            'mean_ms': round(sum(durations) / len(durations), 2),
+            'queries_per_request': round(sum(query_counts) / len(query_counts), 1),
+            'peak_alloc_mb': round(peak_bytes / 1024 / 1024, 2),
+            'response_bytes': size,
+        }
+        result = results[name]
+        print(f"{name:<24} p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms  "
+              f"p99 {result['p99_ms']:8.1f} ms  {result['queries_per_request']:5.1f} interogări  "
+              f"{result['peak_alloc_mb']:7.2f} MB  {result['response_bytes']:>9} B  "
+              + ', '.join(f'{status}x{count}' for status, count in sorted(statuses.items())))
+
+    report = {
+        'meta': {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'database': engine.dialect.name,
+            'user': args.user,
+            'user_activities': activity_count,
+            'total_activities': total_activities,
+            'requests_per_route': args.requests,
+            'cold': args.cold,
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+        },
+        'routes': results,
+    }
+    print(f"RSS vârf al procesului: {report['meta']['peak_rss_mb']:.1f} MB "
+          f"({activity_count} activități ale utilizatorului, {total_activities} în total)")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)['routes']
+        print(f'\nFață de {args.compare} (p95, interogări):')
+        for name, result in results.items():
+            if name not in previous:
+                continue
+            before = previous[name]
+            ratio = result['p95_ms'] / before['p95_ms'] if before['p95_ms'] else float('inf')
+            print(f"{name:<24} {before['p95_ms']:8.1f} -> {result['p95_ms']:8.1f} ms ({ratio:5.2f}x)  "
+                  f"{before['queries_per_request']:5.1f} -> {result['queries_per_request']:5.1f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Timpul de pornire și memoria unui worker
+
+Pornește un proces Python nou care importă aplicația (exact ce face fiecare
+worker gunicorn la boot) și măsoară:
+  - timpul de import al modulului `app`;
+  - RSS-ul după import, după primul request și după primul export Excel
+    (care încarcă openpyxl la cerere);
+  - modulele cele mai scumpe la import (din `python -X importtime`).
+
+Scriptul se termină cu cod de eroare dacă pandas, numpy sau openpyxl sunt
+încărcate deja la boot, ca importurile grele să nu se strecoare înapoi.
+
+Utilizare:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 5 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Module care nu trebuie importate la pornirea unui worker
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl')
+
+def rss_mb():
+    """RSS-ul curent (Linux) sau, în lipsă, vârful RSS al procesului"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage / (1024 * 1024) if sys.platform == 'darwin' else usage / 1024
+
+def measure_worker():
+    """Rulează în procesul copil: importă aplicația și afișează măsurătorile ca JSON"""
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    before = rss_mb()
+    started = time.perf_counter()
+    import app
+    import_seconds = time.perf_counter() - started
+    after_import = rss_mb()
+    loaded_heavy = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    client = app.app.test_client()
+    client.get('/login')
+    after_request = rss_mb()
+
+    from exports import write_xlsx
+    path = write_xlsx(['Data', 'Ore'], [['2025-01-06', 8.0]])
+    os.remove(path)
+    after_export = rss_mb()
+
+    print(json.dumps({
+        'import_seconds': round(import_seconds, 4),
+        'rss_before_mb': round(before, 1),
+        'rss_after_import_mb': round(after_import, 1),
+        'rss_after_request_mb': round(after_request, 1),
+        'rss_after_export_mb': round(after_export, 1),
+        'heavy_modules_at_boot': loaded_heavy,
+    }))
+
+def import_profile(env, top=10):
+    """Importurile directe ale aplicației, ordonate după timpul cumulat"""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    entries = []
+    pending = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        # Nivelul de imbricare apare ca indentare, iar un modul apare după importurile lui:
+        # '   modul' (importat de app) ... apoi ' app'
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        if depth == 1:
+            pending.append((int(cumulative_us), name.strip()))
+        elif depth == 0:
+            if name.strip() == 'app':
+                entries = pending + [(int(cumulative_us), 'app')]
+            pending = []
+    return [{'module': name, 'cumulative_ms': round(us / 1000, 1)}
+            for us, name in sorted(entries, reverse=True)[:top]]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3, help='Câte procese noi se pornesc (se raportează mediana)')
+    parser.add_argument('--output', help='Fișier JSON în care se salvează rezultatele')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        measure_worker()
+        return
+
+    env = dict(os.environ)
+    # Măsurăm aplicația, nu conexiunea la baza de date
+    env.setdefault('DATABASE_URL', 'sqlite://')
+
+    runs = []
+    for _ in range(args.runs):
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--worker'],
+            env=env, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            print(completed.stderr)
+            sys.exit(completed.returncode)
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    summary = {
+        key: statistics.median(run[key] for run in runs)
+        for key in ('import_seconds', 'rss_after_import_mb', 'rss_after_request_mb', 'rss_after_export_mb')
+    }
+    summary['heavy_modules_at_boot'] = sorted({name for run in runs for name in run['heavy_modules_at_boot']})
+    summary['slowest_imports'] = import_profile(env)
+
+    print(f"Import app:            {summary['import_seconds'] * 1000:.0f} ms (mediana din {len(runs)})")
+    print(f"RSS după import:       {summary['rss_after_import_mb']:.1f} MB")
+    print(f"RSS după un request:   {summary['rss_after_request_mb']:.1f} MB")
+    print(f"RSS după export Excel: {summary['rss_after_export_mb']:.1f} MB")
+    print("Cele mai scumpe importuri:")
+    for entry in summary['slowest_imports']:
+        print(f"  {entry['cumulative_ms']:8.1f} ms  {entry['module']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'runs': runs, 'summary': summary}, f, indent=2)
+
+    if summary['heavy_modules_at_boot']:
+        print(f"Module grele încărcate la pornire: {', '.join(summary['heavy_modules_at_boot'])}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
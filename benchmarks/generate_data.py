@@ -0,0 +1,218 @@
+"""
+Date sintetice pentru benchmark-uri
+
+Umple o bază de date cu utilizatori, activități zilnice, absențe și
+cheltuieli, cu cardinalități apropiate de cele reale: fiecare utilizator
+lucrează pentru câțiva clienți (dintr-un total de --clients), pe câteva
+proiecte ale fiecăruia, în zilele lucrătoare care nu cad în concediu.
+Rândurile sunt inserate în loturi (executemany), apoi rollup-ul și versiunile
+datelor sunt reconstruite o singură dată, la final.
+
+Utilizatorii se numesc bench0001, bench0002, ... și au toți parola dată cu
+--password, ca bench_routes.py și load_test.py să se poată autentifica.
+
+Implicit datele sunt scrise în benchmarks/bench.db, nu în baza de date a
+aplicației.
+
+Utilizare:
+    python benchmarks/generate_data.py                        # 500 utilizatori x 5 ani
+    python benchmarks/generate_data.py --users 50 --years 1
+    python benchmarks/generate_data.py --database-url postgresql://localhost/bench
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from sqlalchemy import insert
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DATABASE_URL = f'sqlite:///{os.path.join(ROOT, "benchmarks", "bench.db")}'
+USERNAME_FORMAT = 'bench{:04d}'
+DEFAULT_PASSWORD = 'parola-bench'
+
+ACTIVITY_TYPES = ['Development', 'Testing', 'Documentation', 'Meeting', 'Analysis', 'Design', 'Support', 'Other']
+EXPENSE_CATEGORIES = ['Transport', 'Echipament', 'Materiale', 'Servicii', 'Altele']
+LEAVE_TYPES = ['Concediu', 'Medical', 'Neplatit', 'Altele']
+STATUSES = ['în așteptare', 'aprobat', 'respins']
+ACHIEVEMENTS = [
+    'Implementare funcționalitate nouă',
+    'Corectare defecte raportate de client',
+    'Revizuire cod și refactorizare',
+    'Documentare API',
+    'Pregătire demo pentru client',
+    '',
+]
+CHALLENGES = ['', '', 'Cerințe neclare', 'Mediu de test indisponibil', 'Dependențe întârziate']
+
+# Câte rânduri intră într-o tranzacție
+CHUNK_SIZE = 5000
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', default=os.environ.get('BENCH_DATABASE_URL', DEFAULT_DATABASE_URL))
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--years', type=float, default=5, help='Câți ani de istoric, până azi')
+    parser.add_argument('--clients', type=int, default=60, help='Câți clienți există în total')
+    parser.add_argument('--projects-per-client', type=int, default=4)
+    parser.add_argument('--activities-per-day', type=float, default=2.5, help='Media activităților într-o zi lucrătoare')
+    parser.add_argument('--expenses-per-month', type=float, default=2)
+    parser.add_argument('--password', default=DEFAULT_PASSWORD)
+    parser.add_argument('--seed', type=int, default=1)
+    return parser.parse_args()
+
+class Writer:
+    """Inserează rândurile în loturi, câte o tranzacție pe lot"""
+
+    def __init__(self, db, table):
+        self.db = db
+        self.statement = insert(table)
+        self.chunk = []
+        self.count = 0
+
+    def add(self, values):
+        self.chunk.append(values)
+        if len(self.chunk) >= CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.chunk:
+            self.db.execute(self.statement, self.chunk)
+            self.db.commit()
+            self.count += len(self.chunk)
+            self.chunk = []
+
+def user_portfolio(rng, clients, projects_per_client):
+    """Clienții și proiectele unui utilizator, cu ponderi: câțiva clienți principali, restul ocazionali"""
+    names = rng.sample(range(clients), k=min(clients, rng.randint(2, 6)))
+    portfolio = []
+    for rank, index in enumerate(names):
+        client = f'Client {index:03d}'
+        projects = rng.sample(range(projects_per_client), k=rng.randint(1, projects_per_client))
+        for project in projects:
+            portfolio.append((client, f'{client} / Proiect {project + 1}', 1.0 / (rank + 1)))
+    return portfolio
+
+def leave_days(rng, start, end):
+    """Absențele unui utilizator: câteva perioade pe an, în total ~20 de zile lucrătoare"""
+    leaves = []
+    day = start
+    while day < end:
+        year_end = min(date(day.year, 12, 31), end)
+        for _ in range(rng.randint(2, 4)):
+            first = day + timedelta(days=rng.randint(0, max(0, (year_end - day).days - 14)))
+            length = rng.choice([1, 2, 3, 5, 7, 10, 14])
+            leaves.append((first, min(first + timedelta(days=length - 1), end), rng.choice(LEAVE_TYPES)))
+        day = year_end + timedelta(days=1)
+    return leaves
+
+def generate_user(rng, args, user_id, start, end, writers):
+    portfolio = user_portfolio(rng, args.clients, args.projects_per_client)
+    weights = [weight for _, _, weight in portfolio]
+
+    off = set()
+    for first, last, leave_type in leave_days(rng, start, end):
+        writers['leaves'].add({
+            'user_id': user_id,
+            'start_date': first,
+            'end_date': last,
+            'leave_type': leave_type,
+            'description': '',
+            'status': rng.choice(STATUSES),
+        })
+        off.update(first + timedelta(days=offset) for offset in range((last - first).days + 1))
+
+    day = start
+    while day <= end:
+        if day.weekday() < 5 and day not in off:
+            count = max(1, round(rng.gauss(args.activities_per_day, 1)))
+            for _ in range(count):
+                client, project, _ = rng.choices(portfolio, weights)[0]
+                # Aproximativ 8 ore pe zi, în pași de jumătate de oră
+                hours = min(8.0, max(0.5, round(8 / count * rng.uniform(0.6, 1.4) * 2) / 2))
+                writers['activities'].add({
+                    'user_id': user_id,
+                    'date': day,
+                    'client': client,
+                    'project': project,
+                    'activity_type': rng.choice(ACTIVITY_TYPES),
+                    'achievements': rng.choice(ACHIEVEMENTS),
+                    'challenges': rng.choice(CHALLENGES),
+                    'hours': hours,
+                })
+        if rng.random() < args.expenses_per_month / 30:
+            client, project, _ = rng.choices(portfolio, weights)[0]
+            writers['expenses'].add({
+                'user_id': user_id,
+                'date': day,
+                'project': project,
+                'amount': round(rng.lognormvariate(4.5, 1), 2),
+                'description': f'Cheltuială {client}',
+                'category': rng.choice(EXPENSE_CATEGORIES),
+                'status': rng.choice(STATUSES),
+            })
+        day += timedelta(days=1)
+
+def main():
+    args = parse_args()
+    # Modulele aplicației citesc DATABASE_URL la import
+    os.environ['DATABASE_URL'] = args.database_url
+    sys.path.insert(0, ROOT)
+
+    from werkzeug.security import generate_password_hash
+    from database import engine, SessionLocal
+    from migrations import upgrade
+    from models import User, Activity, Leave, Expense, UserDataVersion
+    from rollup import rebuild_rollup
+
+    upgrade(engine)
+    db = SessionLocal()
+    try:
+        if db.query(User.id).filter(User.username == USERNAME_FORMAT.format(1)).first():
+            raise SystemExit('Baza de date conține deja date generate; folosiți altă bază de date (--database-url)')
+
+        started = time.perf_counter()
+        # Un singur hash pentru toți utilizatorii: hash-ul parolei durează intenționat mult
+        password_hash = generate_password_hash(args.password)
+        db.execute(insert(User.__table__), [
+            {'username': USERNAME_FORMAT.format(index), 'email': f'{USERNAME_FORMAT.format(index)}@example.com',
+             'password': password_hash, 'is_admin': False}
+            for index in range(1, args.users + 1)
+        ])
+        db.commit()
+        user_ids = [user_id for user_id, in db.query(User.id).filter(User.username.like('bench%')).order_by(User.id)]
+
+        rng = random.Random(args.seed)
+        end = date.today()
+        start = end - timedelta(days=round(args.years * 365))
+        writers = {
+            'activities': Writer(db, Activity.__table__),
+            'leaves': Writer(db, Leave.__table__),
+            'expenses': Writer(db, Expense.__table__),
+        }
+        for number, user_id in enumerate(user_ids, 1):
+            generate_user(rng, args, user_id, start, end, writers)
+            if number % 50 == 0 or number == len(user_ids):
+                elapsed = time.perf_counter() - started
+                print(f'{number}/{len(user_ids)} utilizatori, '
+                      f"{writers['activities'].count + len(writers['activities'].chunk)} activități, {elapsed:.1f} s")
+        for writer in writers.values():
+            writer.flush()
+
+        rollup_started = time.perf_counter()
+        rebuild_rollup(db, user_ids)
+        db.execute(insert(UserDataVersion.__table__), [{'user_id': user_id, 'version': 1} for user_id in user_ids])
+        db.commit()
+        print(f'Rollup reconstruit în {time.perf_counter() - rollup_started:.1f} s')
+    finally:
+        db.close()
+
+    print(f"Gata în {time.perf_counter() - started:.1f} s: {len(user_ids)} utilizatori, "
+          f"{writers['activities'].count} activități, {writers['leaves'].count} absențe, "
+          f"{writers['expenses'].count} cheltuieli")
+    print(f'Autentificare: {USERNAME_FORMAT.format(1)} / {args.password}')
+
+if __name__ == '__main__':
+    main()
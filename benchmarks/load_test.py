@@ -0,0 +1,414 @@
+"""
+Test de încărcare pe un server local cu mai mulți workeri
+
+Pornește aplicația sub gunicorn (ca pe Heroku, cu --workers procese) și
+simulează --users utilizatori autentificați simultan, fiecare cu propria
+sesiune (cookie), care aleg la întâmplare, după ponderile din ROUTE_MIX:
+dashboard, adăugare de activități, rapoarte, listări și exporturi, cu o
+pauză de gândire între cereri. La final raportează:
+  - debitul (cereri/s) și latența p50/p95/p99 pe rută și în total;
+  - erorile, după tip: status HTTP, redirecționări de eroare ale aplicației,
+    conexiuni eșuate și "database is locked" (din răspunsuri și din log-ul
+    serverului, unde ajung erorile la adăugarea activităților).
+
+Conturile sunt cele create de generate_data.py (bench0001, ...). Cu
+--postgres scriptul pornește un PostgreSQL temporar (initdb + pg_ctl, în
+directorul temporar), generează date în el și îl oprește la final; cu
+--url folosește un server deja pornit.
+
+Utilizare:
+    python benchmarks/generate_data.py --users 50
+    python benchmarks/load_test.py --workers 4 --users 20 --duration 60
+    python benchmarks/load_test.py --postgres --workers 4 --users 20 --output pg.json
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --users 10
+"""
+
+import argparse
+import http.cookiejar
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_routes import percentile  # noqa: E402
+from generate_data import (ROOT, DEFAULT_DATABASE_URL, DEFAULT_PASSWORD, USERNAME_FORMAT,  # noqa: E402
+                           ACTIVITY_TYPES)
+
+# (nume, pondere); URL-urile și datele sunt construite în VirtualUser.request_for
+ROUTE_MIX = [
+    ('dashboard', 30),
+    ('add_activity', 15),
+    ('report_weekly', 10),
+    ('report_monthly', 10),
+    ('report_client', 5),
+    ('report_project', 5),
+    ('activities_page', 10),
+    ('leaves', 4),
+    ('expenses', 4),
+    ('export_csv', 4),
+    ('export_excel', 3),
+]
+
+LOCKED = 'database is locked'
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Redirecționările sunt întoarse ca atare: destinația arată dacă operația a reușit"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+class Results:
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def record(self, route, seconds, error=None):
+        with self._lock:
+            self.samples.setdefault(route, []).append((seconds * 1000, error))
+            if error:
+                self.errors[error] = self.errors.get(error, 0) + 1
+
+class VirtualUser(threading.Thread):
+    def __init__(self, number, args, base_url, results, deadline):
+        super().__init__(daemon=True)
+        self.username = USERNAME_FORMAT.format(number % args.accounts + 1)
+        self.args = args
+        self.base_url = base_url
+        self.results = results
+        self.deadline = deadline
+        self.rng = random.Random(args.seed + number)
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), NoRedirect
+        )
+        self.clients = []
+        self.projects = []
+
+    def fetch(self, method, path, data=None):
+        """(status, antete, corp) pentru o cerere; erorile HTTP sunt întoarse, nu ridicate"""
+        body = urllib.parse.urlencode(data).encode('utf-8') if data is not None else None
+        request = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with self.opener.open(request, timeout=self.args.timeout) as response:
+                return response.status, response.headers, response.read()
+        except urllib.error.HTTPError as e:
+            with e:
+                return e.code, e.headers, e.read()
+
+    def login(self):
+        status, headers, _ = self.fetch('POST', '/login', {'username': self.username, 'password': self.args.password})
+        if status != 302 or headers.get('Location', '').endswith('/login'):
+            return False
+        # Clienții și proiectele utilizatorului, pentru rapoartele pe client/proiect
+        _, _, body = self.fetch('GET', '/api/activities?limit=200&fields=client,project')
+        for activity in json.loads(body).get('activities', []):
+            if activity['client'] not in self.clients:
+                self.clients.append(activity['client'])
+            if activity['project'] not in self.projects:
+                self.projects.append(activity['project'])
+        return True
+
+    def request_for(self, route):
+        today = date.today()
+        if route == 'dashboard':
+            return 'GET', '/', None
+        if route == 'add_activity':
+            return 'POST', '/add_activity', {
+                'date': (today - timedelta(days=self.rng.randint(0, 30))).isoformat(),
+                'client': self.rng.choice(self.clients or ['Client load-test']),
+                'project': self.rng.choice(self.projects or ['Proiect load-test']),
+                'activity_type': self.rng.choice(ACTIVITY_TYPES),
+                'achievements': 'Test de încărcare',
+                'challenges': '',
+                'hours': str(self.rng.choice([0.5, 1, 1.5, 2, 4])),
+            }
+        if route == 'report_weekly':
+            monday = today - timedelta(days=today.weekday() + 7 * self.rng.randint(0, 8))
+            return 'POST', '/api/report/weekly', {'start_date': monday.isoformat()}
+        if route == 'report_monthly':
+            month = date(today.year, today.month, 1) - timedelta(days=31 * self.rng.randint(0, 11))
+            return 'POST', '/api/report/monthly', {'month': month.strftime('%Y-%m')}
+        if route == 'report_client':
+            return 'POST', '/api/report/client', {'client': self.rng.choice(self.clients or [''])}
+        if route == 'report_project':
+            return 'POST', '/api/report/project', {'project': self.rng.choice(self.projects or [''])}
+        if route == 'activities_page':
+            return 'GET', '/api/activities', None
+        if route == 'leaves':
+            return 'GET', '/api/leaves', None
+        if route == 'expenses':
+            return 'GET', '/api/expenses', None
+        if route == 'export_csv':
+            return 'GET', '/export_data/csv', None
+        if route == 'export_excel':
+            return 'GET', '/export_data/excel', None
+        raise ValueError(route)
+
+    def classify(self, route, status, headers, body):
+        """Tipul erorii pentru un răspuns sau None dacă cererea a reușit"""
+        if status >= 400:
+            return 'database_locked' if LOCKED.encode() in body else f'http_{status}'
+        if 300 <= status < 400:
+            location = headers.get('Location', '')
+            if location.endswith('/login'):
+                return 'redirect_login'
+            # O activitate care nu a putut fi salvată trimite înapoi la formular
+            if route == 'add_activity' and not location.endswith('/'):
+                return 'add_activity_failed'
+        return None
+
+    def run(self):
+        names = [name for name, _ in ROUTE_MIX]
+        weights = [weight for _, weight in ROUTE_MIX]
+        started = time.perf_counter()
+        try:
+            logged_in = self.login()
+        except (OSError, ValueError):
+            logged_in = False
+        if not logged_in:
+            self.results.record('login', time.perf_counter() - started, 'login_failed')
+            return
+
+        while time.monotonic() < self.deadline:
+            route = self.rng.choices(names, weights)[0]
+            method, path, data = self.request_for(route)
+            started = time.perf_counter()
+            try:
+                status, headers, body = self.fetch(method, path, data)
+                error = self.classify(route, status, headers, body)
+            except OSError as e:
+                error = f'connection_{type(e).__name__}'
+            self.results.record(route, time.perf_counter() - started, error)
+            if self.args.think_time > 0:
+                time.sleep(self.rng.expovariate(1 / self.args.think_time))
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def wait_for(url, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise SystemExit(f'Serverul s-a oprit la pornire (cod {process.returncode})')
+        try:
+            with urllib.request.urlopen(url, timeout=2):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit(f'{url} nu răspunde după {timeout} s')
+
+class TemporaryPostgres:
+    """Un cluster PostgreSQL de unică folosință, creat cu initdb și pornit cu pg_ctl"""
+
+    def __init__(self, workdir):
+        self.bindir = self._bindir()
+        self.started = False
+        self.data_dir = os.path.join(workdir, 'pgdata')
+        self.socket_dir = workdir
+        self.log_path = os.path.join(workdir, 'postgres.log')
+        self.port = free_port()
+
+    @staticmethod
+    def _bindir():
+        candidates = []
+        if shutil.which('initdb'):
+            candidates.append(os.path.dirname(shutil.which('initdb')))
+        if shutil.which('pg_config'):
+            candidates.append(subprocess.run(['pg_config', '--bindir'], capture_output=True, text=True).stdout.strip())
+        for bindir in candidates:
+            if os.path.exists(os.path.join(bindir, 'initdb')):
+                return bindir
+        raise SystemExit('initdb nu a fost găsit; instalați serverul PostgreSQL sau folosiți --database-url')
+
+    def _run(self, name, *arguments):
+        completed = subprocess.run([os.path.join(self.bindir, name), *arguments], capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise SystemExit(f'{name} a eșuat:\n{completed.stderr.strip()}')
+
+    def start(self):
+        self._run('initdb', '-D', self.data_dir, '-U', 'postgres', '--auth=trust', '-E', 'UTF8')
+        self._run('pg_ctl', '-D', self.data_dir, '-l', self.log_path, '-w', 'start', '-o',
+                  f"-p {self.port} -k {self.socket_dir} -c listen_addresses=127.0.0.1 -c fsync=off")
+        self.started = True
+        self._run('createdb', '-h', '127.0.0.1', '-p', str(self.port), '-U', 'postgres', 'worktracker')
+        return f'postgresql://postgres@127.0.0.1:{self.port}/worktracker'
+
+    def stop(self):
+        if self.started:
+            self._run('pg_ctl', '-D', self.data_dir, '-m', 'fast', '-w', 'stop')
+            self.started = False
+
+def start_server(args, database_url, workdir):
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=database_url, METRICS_DIR=os.path.join(workdir, 'metrics'))
+    env.setdefault('SLOW_QUERY_LOG', os.path.join(workdir, 'slow_queries.jsonl'))
+    log_path = os.path.join(workdir, 'server.log')
+    log = open(log_path, 'wb')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'app:app', '--bind', f'127.0.0.1:{port}',
+         '--workers', str(args.workers), '--timeout', '120'],
+        cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    log.close()
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        wait_for(base_url + '/login', process)
+    except SystemExit:
+        process.terminate()
+        with open(log_path, encoding='utf-8', errors='replace') as f:
+            print(''.join(f.readlines()[-20:]), file=sys.stderr)
+        raise
+    return process, base_url
+
+def summarize(results, elapsed):
+    routes = {}
+    all_durations = []
+    for route, samples in sorted(results.samples.items()):
+        durations = sorted(duration for duration, _ in samples)
+        all_durations.extend(durations)
+        errors = sum(1 for _, error in samples if error)
+        routes[route] = {
+            'requests': len(samples),
+            'errors': errors,
+            'requests_per_second': round(len(samples) / elapsed, 2),
+            'p50_ms': round(percentile(durations, 0.50), 1),
+            'p95_ms': round(percentile(durations, 0.95), 1),
+            'p99_ms': round(percentile(durations, 0.99), 1),
+            'max_ms': round(durations[-1], 1),
+        }
+    all_durations.sort()
+    total = len(all_durations)
+    error_count = sum(results.errors.values())
+    return {
+        'requests': total,
+        'seconds': round(elapsed, 1),
+        'requests_per_second': round(total / elapsed, 2) if elapsed else 0,
+        'error_rate': round(error_count / total, 4) if total else 0,
+        'p50_ms': round(percentile(all_durations, 0.50), 1) if total else None,
+        'p95_ms': round(percentile(all_durations, 0.95), 1) if total else None,
+        'p99_ms': round(percentile(all_durations, 0.99), 1) if total else None,
+        'errors': dict(sorted(results.errors.items())),
+        'routes': routes,
+    }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--database-url', default=os.environ.get('BENCH_DATABASE_URL', DEFAULT_DATABASE_URL))
+    target.add_argument('--postgres', action='store_true', help='Pornește un PostgreSQL temporar')
+    target.add_argument('--url', help='Un server deja pornit (nu se mai pornește gunicorn)')
+    parser.add_argument('--workers', type=int, default=4, help='Workerii gunicorn')
+    parser.add_argument('--users', type=int, default=20, help='Utilizatori simultani')
+    parser.add_argument('--accounts', type=int, default=50, help='Câte conturi benchNNNN sunt folosite')
+    parser.add_argument('--password', default=DEFAULT_PASSWORD)
+    parser.add_argument('--duration', type=float, default=60, help='Durata testului, în secunde')
+    parser.add_argument('--think-time', type=float, default=0.5, help='Pauza medie dintre cereri, în secunde')
+    parser.add_argument('--timeout', type=float, default=60, help='Timeout-ul unei cereri, în secunde')
+    parser.add_argument('--generate-years', type=float, default=1,
+                        help='Istoricul generat pentru PostgreSQL-ul temporar, în ani')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Fișier JSON în care se salvează rezultatele')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix='worktracker-load-')
+    postgres = None
+    server = None
+    database_url = args.database_url
+    try:
+        if args.postgres:
+            postgres = TemporaryPostgres(workdir)
+            database_url = postgres.start()
+            print(f'PostgreSQL temporar pe portul {postgres.port}; se generează datele...')
+            subprocess.run([sys.executable, os.path.join(ROOT, 'benchmarks', 'generate_data.py'),
+                            '--database-url', database_url, '--users', str(args.accounts),
+                            '--years', str(args.generate_years), '--password', args.password], check=True)
+
+        if args.url:
+            base_url = args.url.rstrip('/')
+            wait_for(base_url + '/login', None)
+        else:
+            server, base_url = start_server(args, database_url, workdir)
+            print(f'gunicorn cu {args.workers} workeri pe {base_url}')
+
+        results = Results()
+        deadline = time.monotonic() + args.duration
+        started = time.perf_counter()
+        users = [VirtualUser(number, args, base_url, results, deadline) for number in range(args.users)]
+        for user in users:
+            user.start()
+        for user in users:
+            user.join()
+        summary = summarize(results, time.perf_counter() - started)
+
+        pool = []
+        try:
+            with urllib.request.urlopen(base_url + '/metrics', timeout=10) as response:
+                pool = [line for line in response.read().decode('utf-8').splitlines()
+                        if line.startswith('worktracker_db_pool')]
+        except OSError:
+            pass
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        if postgres is not None:
+            postgres.stop()
+
+    server_locked = 0
+    log_path = os.path.join(workdir, 'server.log')
+    if os.path.exists(log_path):
+        with open(log_path, encoding='utf-8', errors='replace') as f:
+            server_locked = sum(LOCKED in line for line in f)
+
+    print(f"\n{summary['requests']} cereri în {summary['seconds']} s: {summary['requests_per_second']} cereri/s, "
+          f"p50 {summary['p50_ms']} ms, p95 {summary['p95_ms']} ms, p99 {summary['p99_ms']} ms, "
+          f"erori {summary['error_rate'] * 100:.2f}%")
+    for route, result in summary['routes'].items():
+        print(f"{route:<16} {result['requests']:>6} cereri  {result['requests_per_second']:7.2f}/s  "
+              f"p50 {result['p50_ms']:8.1f}  p95 {result['p95_ms']:8.1f}  p99 {result['p99_ms']:8.1f}  "
+              f"max {result['max_ms']:8.1f} ms  {result['errors']:>4} erori")
+    for error, count in summary['errors'].items():
+        print(f'eroare {error}: {count}')
+    print(f"'{LOCKED}' în log-ul serverului: {server_locked}")
+    for line in pool:
+        print(line)
+
+    if args.output:
+        report = {
+            'config': {
+                'database': 'postgresql' if args.postgres else (None if args.url else database_url.split(':', 1)[0]),
+                'url': args.url,
+                'workers': None if args.url else args.workers,
+                'users': args.users,
+                'accounts': args.accounts,
+                'duration': args.duration,
+                'think_time': args.think_time,
+                'route_mix': dict(ROUTE_MIX),
+            },
+            'summary': summary,
+            'server_database_locked': server_locked,
+            'pool': pool,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if server is not None or postgres is not None:
+        print(f'Log-urile serverului: {workdir}')
+
+if __name__ == '__main__':
+    main()
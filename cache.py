@@ -0,0 +1,46 @@
+"""
+Cache simplu în memorie, cu expirare (TTL)
+
+Fiecare worker gunicorn are propriul cache. Invalidarea explicită se face doar
+în worker-ul care a procesat scrierea, așa că TTL-ul limitează cât de vechi pot
+fi datele văzute de ceilalți workeri.
+"""
+
+import threading
+import time
+
+class TTLCache:
+    def __init__(self, ttl, maxsize=1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Valoarea din cache sau None dacă lipsește ori a expirat"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            if len(self._data) >= self.maxsize and key not in self._data:
+                # Eliminăm intrarea cea mai veche (dict-ul păstrează ordinea inserării)
+                self._data.pop(next(iter(self._data)))
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
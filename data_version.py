@@ -0,0 +1,30 @@
+"""
+Versiunea datelor fiecărui utilizator
+
+Orice scriere în activitățile, absențele sau cheltuielile unui utilizator
+crește versiunea lui, în aceeași tranzacție cu scrierea. Răspunsurile GET
+folosesc versiunea în ETag: dacă versiunea nu s-a schimbat, nici datele nu
+s-au schimbat, iar cererea poate primi 304 fără să citească tabelele mari.
+Un utilizator fără rând în tabelă are versiunea 0.
+"""
+
+from sqlalchemy import select
+from sqlalchemy.dialects import sqlite, postgresql
+from models import UserDataVersion
+
+VERSIONS = UserDataVersion.__table__
+
+def bump_data_version(db, user_ids):
+    """Crește versiunea pentru utilizatorii dați; nu face commit"""
+    rows = [{"user_id": user_id, "version": 1} for user_id in sorted(set(user_ids)) if user_id is not None]
+    if not rows:
+        return
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(VERSIONS)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[VERSIONS.c.user_id],
+        set_={"version": VERSIONS.c.version + 1}
+    ), rows)
+
+def get_data_version(db, user_id):
+    return db.execute(select(VERSIONS.c.version).where(VERSIONS.c.user_id == user_id)).scalar() or 0
@@ -1,5 +1,10 @@
-import json
+import bisect
+import heapq
+from collections import defaultdict
 from datetime import datetime, timedelta  # Am adăugat timedelta aici
+from datetime import date as date_type
+import os
+from activity_storage import JournalStorage, SqlActivityStorage
 
 # Listele predefinite rămân la fel
 CLIENTI_PREDEFINITI = [
@@ -28,9 +33,9 @@ ACTIVITATI_PREDEFINITE = [
 ]
 
 class EmployeeActivity:
-    def __init__(self):
+    def __init__(self, storage=None):
         self.activities = []
-        self.filename = "activities.json"
+        self.storage = storage or JournalStorage("activities.json")
         self.load_activities()
 
     # ... toate metodele existente rămân la fel ...
@@ -65,18 +70,20 @@ class EmployeeActivity:
         start_str = start_date.strftime('%Y-%m-%d')
         end_str = end_date.strftime('%Y-%m-%d')
         
-        for activity in self.activities:
-            activity_date = datetime.strptime(activity['date'], '%Y-%m-%d')
-            if start_str <= activity['date'] <= end_str:
-                period_activities.append(activity)
-                hours = activity['hours']
-                total_hours += hours
-                
-                client = activity['client']
-                hours_per_client[client] = hours_per_client.get(client, 0) + hours
-                
-                project = activity['project']
-                hours_per_project[project] = hours_per_project.get(project, 0) + hours
+        # Activitățile din perioadă sunt o felie continuă a listei sortate după dată
+        start = bisect.bisect_left(self.date_ordinals, start_date.toordinal())
+        end = bisect.bisect_right(self.date_ordinals, end_date.toordinal())
+        
+        for activity in self.activities_by_date[start:end]:
+            period_activities.append(activity)
+            hours = activity['hours']
+            total_hours += hours
+            
+            client = activity['client']
+            hours_per_client[client] = hours_per_client.get(client, 0) + hours
+            
+            project = activity['project']
+            hours_per_project[project] = hours_per_project.get(project, 0) + hours
         
         return {
             'activities': period_activities,
@@ -88,16 +95,79 @@ class EmployeeActivity:
         }
 
     def save_activities(self):
-        with open(self.filename, 'w', encoding='utf-8') as f:
-            json.dump(self.activities, f, indent=4, ensure_ascii=False)
+        """Rescrie snapshot-ul complet; adăugările obișnuite merg doar în jurnal"""
+        self.storage.compact(self.activities)
         print("Activitățile au fost salvate în fișier!")
 
     def load_activities(self):
-        try:
-            with open(self.filename, 'r', encoding='utf-8') as f:
-                self.activities = json.load(f)
-        except FileNotFoundError:
-            self.activities = []
+        self.activities = self.storage.load()
+        # Fișierele vechi conțin și date nepadate (2025-1-07)
+        for activity in self.activities:
+            activity['date'] = normalize_date(activity['date'])
+        self.next_id = max((a['activity_id'] for a in self.activities), default=0) + 1
+        self.build_indexes()
+        # Un jurnal lung încetinește pornirea: îl comprimăm în snapshot
+        if self.storage.needs_compaction:
+            self.storage.compact(self.activities)
+
+    def close(self):
+        self.storage.close()
+
+    def build_indexes(self):
+        """
+        Indecșii folosiți de search_activities: activitățile grupate după dată,
+        client și proiect (fără diferențe de majuscule), plus lista sortată a
+        clienților pentru căutarea după începutul numelui.
+        """
+        self.by_date = defaultdict(list)
+        self.by_client = defaultdict(list)
+        self.by_project = defaultdict(list)
+        for activity in self.activities:
+            self._index_activity(activity)
+        self.client_names = sorted(self.by_client)
+        
+        # Activitățile sortate după dată și, în paralel, zilele lor ca ordinal,
+        # pentru căutarea cu bisect a intervalelor din rapoarte
+        dated = sorted(
+            ((ordinal, a) for a in self.activities for ordinal in [date_ordinal(a['date'])] if ordinal is not None),
+            key=lambda item: item[0]
+        )
+        self.date_ordinals = [ordinal for ordinal, _ in dated]
+        self.activities_by_date = [activity for _, activity in dated]
+
+    def _index_activity(self, activity):
+        """Adaugă activitatea în indecși; întoarce True dacă a apărut un client nou"""
+        client = (activity.get('client') or '').casefold()
+        is_new_client = client not in self.by_client
+        self.by_date[activity['date']].append(activity)
+        self.by_client[client].append(activity)
+        self.by_project[(activity.get('project') or '').casefold()].append(activity)
+        return is_new_client
+
+    def search_activities(self, field, value):
+        """
+        Caută activități după "date" (YYYY-MM-DD), "client" (numele sau
+        începutul lui) sau "project" (numele complet). Majusculele nu contează.
+        """
+        if field == "date":
+            return list(self.by_date.get(normalize_date(value), []))
+        if field == "project":
+            return list(self.by_project.get(value.strip().casefold(), []))
+        if field != "client":
+            raise ValueError(f"Câmp de căutare necunoscut: {field}")
+
+        # Numele care încep cu prefixul sunt consecutive în lista sortată
+        prefix = value.strip().casefold()
+        start = bisect.bisect_left(self.client_names, prefix)
+        matches = []
+        for name in self.client_names[start:]:
+            if not name.startswith(prefix):
+                break
+            matches.append(self.by_client[name])
+        if len(matches) == 1:
+            return list(matches[0])
+        # Fiecare listă este în ordinea adăugării; le interclasăm după id
+        return list(heapq.merge(*matches, key=lambda a: a['activity_id']))
 
     def choose_from_list(self, items, item_type):
         print(f"\nAlege {item_type} din lista următoare:")
@@ -118,7 +188,9 @@ class EmployeeActivity:
                 print("Te rog introdu un număr valid!")
 
     def add_activity(self, date, client, project, activity_type, achievements, challenges, hours):
+        date = normalize_date(date)
         activity = {
+            "activity_id": self.next_id,
             "date": date,
             "client": client,
             "project": project,
@@ -128,15 +200,26 @@ class EmployeeActivity:
             "hours": hours
         }
         self.activities.append(activity)
-        self.save_activities()
+        self.next_id += 1
+        if self._index_activity(activity):
+            bisect.insort(self.client_names, client.casefold())
+        ordinal = date_ordinal(date)
+        if ordinal is not None:
+            position = bisect.bisect_right(self.date_ordinals, ordinal)
+            self.date_ordinals.insert(position, ordinal)
+            self.activities_by_date.insert(position, activity)
+        self.storage.append(activity)
+        if self.storage.needs_compaction:
+            self.storage.compact(self.activities)
         print("Activitate adăugată cu succes!")
 
+    def iter_activities(self):
+        return iter(self.activities)
+
     def view_activities(self):
-        if not self.activities:
-            print("Nu există activități înregistrate.")
-            return
-        
-        for activity in self.activities:
+        found = False
+        for activity in self.iter_activities():
+            found = True
             print("\n--- Activitate ---")
             print(f"Data: {activity['date']}")
             print(f"Client: {activity['client']}")
@@ -145,6 +228,9 @@ class EmployeeActivity:
             print(f"Realizări: {activity['achievements']}")
             print(f"Provocări: {activity['challenges']}")
             print(f"Ore lucrate: {activity['hours']}")
+        
+        if not found:
+            print("Nu există activități înregistrate.")
 
     def calculate_hours(self, calculation_type):
         total_hours = {}
@@ -160,6 +246,85 @@ class EmployeeActivity:
         
         return total_hours
 
+class SqlEmployeeActivity(EmployeeActivity):
+    """
+    Aceeași interfață ca EmployeeActivity, cu activitățile din baza de date a
+    aplicației web (vezi SqlActivityStorage). Nu ține activitățile în memorie:
+    căutările și rapoartele sunt calculate de baza de date.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def add_activity(self, date, client, project, activity_type, achievements, challenges, hours):
+        try:
+            self.storage.add({
+                "date": date,
+                "client": client,
+                "project": project,
+                "activity_type": activity_type,
+                "achievements": achievements,
+                "challenges": challenges,
+                "hours": hours
+            })
+        except ValueError as e:
+            print(f"Activitatea nu a fost adăugată: {e}")
+            return
+        print("Activitate adăugată cu succes!")
+
+    def save_activities(self):
+        self.storage.flush()
+        print("Activitățile au fost salvate în baza de date!")
+
+    def iter_activities(self):
+        return self.storage.iter_activities()
+
+    def search_activities(self, field, value):
+        return self.storage.search(field, value)
+
+    def generate_period_report(self, start_date, end_date):
+        report = self.storage.period_report(start_date.date(), end_date.date())
+        report['start_date'] = start_date.strftime('%Y-%m-%d')
+        report['end_date'] = end_date.strftime('%Y-%m-%d')
+        return report
+
+    def calculate_hours(self, calculation_type):
+        return self.storage.hours_by(calculation_type)
+
+def create_tracker(backend=None, username=None):
+    """
+    Tracker-ul pentru backend-ul ales: "json" (fișierele locale, implicit) sau
+    "sql" (baza de date a aplicației web, pentru utilizatorul `username`).
+    Valorile implicite vin din ACTIVITY_BACKEND și ACTIVITY_USER.
+    """
+    backend = backend or os.environ.get("ACTIVITY_BACKEND", "json")
+    if backend == "json":
+        return EmployeeActivity()
+    if backend == "sql":
+        username = username or os.environ.get("ACTIVITY_USER")
+        if not username:
+            raise ValueError("Backend-ul sql are nevoie de un utilizator (--user sau ACTIVITY_USER)")
+        return SqlEmployeeActivity(SqlActivityStorage(username))
+    raise ValueError(f"Backend necunoscut: {backend}")
+
+def _parse_date(date_string):
+    # split + date() este de câteva ori mai rapid decât strptime, care contează
+    # la încărcarea a sute de mii de activități
+    try:
+        year, month, day = date_string.split('-')
+        return date_type(int(year), int(month), int(day))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+def normalize_date(date_string):
+    """'2025-1-07' -> '2025-01-07'; textele care nu sunt date rămân neschimbate"""
+    parsed = _parse_date(date_string)
+    return parsed.isoformat() if parsed is not None else date_string
+
+def date_ordinal(date_string):
+    parsed = _parse_date(date_string)
+    return parsed.toordinal() if parsed is not None else None
+
 def validate_date(date_string):
     try:
         datetime.strptime(date_string, '%Y-%m-%d')
@@ -0,0 +1,113 @@
+"""
+Exporturi de activități și cheltuieli
+
+Rândurile sunt citite din baza de date în loturi (`yield_per`) și scrise pe
+măsură ce sunt produse, așa că memoria folosită nu depinde de cât de lung
+este istoricul exportat.
+
+openpyxl este importat abia la primul export Excel, ca workerii care nu
+servesc exporturi să nu plătească timpul de import și memoria lui.
+"""
+
+import csv
+import os
+import tempfile
+import unicodedata
+from io import StringIO
+from urllib.parse import quote
+from models import Activity, Expense
+
+ACTIVITY_COLUMNS = ['Angajat', 'Data', 'Client', 'Proiect', 'Tip Activitate', 'Ore', 'Realizări', 'Provocări']
+EXPENSE_COLUMNS = ['Angajat', 'Data', 'Proiect', 'Categorie', 'Descriere', 'Sumă', 'Status']
+
+# Câte rânduri se citesc dintr-o dată din baza de date
+BATCH_SIZE = 1000
+
+def activity_rows(db, user_id, user_name, batch_size=BATCH_SIZE):
+    """Rândurile exportului de activități, în ordinea coloanelor ACTIVITY_COLUMNS"""
+    query = db.query(
+        Activity.date,
+        Activity.client,
+        Activity.project,
+        Activity.activity_type,
+        Activity.hours,
+        Activity.achievements,
+        Activity.challenges
+    ).filter(Activity.user_id == user_id).order_by(Activity.id).yield_per(batch_size)
+    for date, client, project, activity_type, hours, achievements, challenges in query:
+        yield [user_name, date, client, project, activity_type, hours, achievements, challenges]
+
+def expense_rows(db, user_id, user_name, batch_size=BATCH_SIZE):
+    """Rândurile exportului de cheltuieli, în ordinea coloanelor EXPENSE_COLUMNS"""
+    query = db.query(
+        Expense.date,
+        Expense.project,
+        Expense.category,
+        Expense.description,
+        Expense.amount,
+        Expense.status
+    ).filter(Expense.user_id == user_id).order_by(Expense.id).yield_per(batch_size)
+    for date, project, category, description, amount, status in query:
+        yield [user_name, date, project, category, description, amount, status]
+
+def iter_csv(columns, rows, chunk_rows=500):
+    """Generează fișierul CSV în bucăți de câteva sute de rânduri"""
+    buffer = StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % chunk_rows == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+def write_xlsx(columns, rows, sheet_title='Sheet1'):
+    """
+    Scrie rândurile într-un fișier .xlsx temporar și întoarce calea lui.
+
+    Workbook-ul este deschis în modul write-only: fiecare rând este serializat
+    imediat pe disc, în loc să fie păstrat în memorie până la salvare.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_title)
+    sheet.append(columns)
+    for row in rows:
+        sheet.append(row)
+
+    handle, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(handle)
+    try:
+        workbook.save(path)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+def iter_file(path, chunk_size=64 * 1024):
+    """Citește un fișier în bucăți, pentru răspunsuri trimise treptat"""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+def remove_file(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+def attachment_headers(download_name):
+    """Content-Disposition pentru descărcare, inclusiv pentru nume de fișier cu diacritice"""
+    try:
+        download_name.encode('ascii')
+        return {'Content-Disposition': f'attachment; filename="{download_name}"'}
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize('NFKD', download_name).encode('ascii', 'ignore').decode('ascii')
+        quoted = quote(download_name, safe='')
+        return {'Content-Disposition': f'attachment; filename="{simple}"; filename*=UTF-8\'\'{quoted}'}
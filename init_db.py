@@ -4,12 +4,13 @@ Rulați acest script o singură dată pentru a crea baza de date și tabelele ne
 """
 
 from database import engine, Base, SessionLocal
+from migrations import upgrade
 from models import User
 from werkzeug.security import generate_password_hash
 
 def init_database():
-    # Creează toate tabelele
-    Base.metadata.create_all(bind=engine)
+    # Creează tabelele și aplică migrațiile (indecși, coloane noi)
+    upgrade(engine)
     
     # Verifică dacă există deja un utilizator admin
     db = SessionLocal()
@@ -1,8 +1,8 @@
-from models import Base
 from database import engine
+from migrations import upgrade
 
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    upgrade(engine)
 
 if __name__ == "__main__":
     print("Crearea tabelelor în baza de date...")
@@ -0,0 +1,159 @@
+"""
+Măsurători per request: durată, interogări SQL, timp în baza de date,
+rânduri și timp de randare a template-urilor
+
+Interogările sunt numărate prin evenimentele before_cursor_execute /
+after_cursor_execute ale engine-ului, iar template-urile printr-o subclasă a
+clasei Template din Jinja. La sfârșitul fiecărui request cifrele sunt trimise:
+  - în antetul Server-Timing (vizibil în tab-ul Network din browser);
+  - ca o linie JSON în logger-ul `worktracker.requests`.
+
+Rândurile numărate sunt cele citite efectiv din cursor (cursorul DBAPI al
+fiecărei interogări care întoarce rânduri este învelit într-un CountingCursor,
+deci sunt prinse atât obiectele ORM, cât și tuplurile de coloane) plus
+rândurile modificate de INSERT/UPDATE/DELETE.
+
+Pentru răspunsurile trimise treptat (exporturile) sunt măsurate doar
+interogările de dinaintea primului octet trimis.
+"""
+
+import json
+import logging
+import sys
+import time
+from flask import g, request, has_request_context
+from jinja2 import Template
+from sqlalchemy import event
+
+logger = logging.getLogger('worktracker.requests')
+
+class RequestStats:
+    __slots__ = ('started', 'queries', 'db_seconds', 'rows', 'render_seconds')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+        self.render_seconds = 0.0
+
+def current_stats():
+    """Măsurătorile request-ului curent sau None în afara unui request"""
+    if not has_request_context():
+        return None
+    return g.get('request_stats')
+
+class TimedTemplate(Template):
+    """Template care adaugă timpul de randare la măsurătorile request-ului"""
+
+    def render(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            stats = current_stats()
+            if stats is not None:
+                stats.render_seconds += time.perf_counter() - started
+
+class CountingCursor:
+    """Cursor DBAPI care adaugă rândurile citite la măsurătorile unui request"""
+
+    def __init__(self, cursor, stats):
+        object.__setattr__(self, '_cursor', cursor)
+        object.__setattr__(self, '_stats', stats)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._cursor, name, value)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats.rows += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._stats.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._stats.rows += len(rows)
+        return rows
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._stats.rows += 1
+            yield row
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Pe context, nu pe conexiune: dacă instrucțiunea eșuează, momentul de start
+    # dispare odată cu contextul. Execuțiile interne fără context (valori implicite,
+    # secvențe) sunt doar numărate.
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_stats()
+    if stats is None:
+        return
+    stats.queries += 1
+    started = getattr(context, '_query_started', None)
+    if started is not None:
+        stats.db_seconds += time.perf_counter() - started
+    if context is None:
+        return
+    if context.isinsert or context.isupdate or context.isdelete:
+        stats.rows += max(cursor.rowcount, 0)
+    elif cursor.description is not None:
+        # Rezultatul este construit din context.cursor după acest eveniment
+        context.cursor = CountingCursor(cursor, stats)
+
+def server_timing(stats, total_seconds):
+    """Valoarea antetului Server-Timing pentru măsurătorile unui request"""
+    return ', '.join([
+        f'app;dur={total_seconds * 1000:.1f}',
+        # Antetele HTTP trebuie să fie latin-1, deci fără diacritice
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} interogari, {stats.rows} randuri"',
+        f'tpl;dur={stats.render_seconds * 1000:.1f}',
+    ])
+
+def init_app(app, engine):
+    """Înregistrează măsurătorile pentru aplicație și engine"""
+    app.jinja_env.template_class = TimedTemplate
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+    @app.before_request
+    def start_request_stats():
+        g.request_stats = RequestStats()
+
+    @app.after_request
+    def record_request_stats(response):
+        stats = g.pop('request_stats', None)
+        if stats is None:
+            return response
+        total_seconds = time.perf_counter() - stats.started
+        response.headers['Server-Timing'] = server_timing(stats, total_seconds)
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'duration_ms': round(total_seconds * 1000, 2),
+            'queries': stats.queries,
+            'db_ms': round(stats.db_seconds * 1000, 2),
+            'rows': stats.rows,
+            'render_ms': round(stats.render_seconds * 1000, 2),
+        }))
+        return response
@@ -0,0 +1,266 @@
+"""
+Metrici în format text Prometheus, expuse la /metrics
+
+Fiecare worker ține metricile în memorie (contoare și histograme) și le scrie
+periodic, atomic, într-un fișier JSON propriu din METRICS_DIR, numit după pid
+și un identificator aleator (un worker repornit poate primi pid-ul unuia oprit
+și nu trebuie să îi suprascrie fișierul). La o cerere
+/metrics se adună fișierele tuturor workerilor, deci răspunsul acoperă tot
+procesul gunicorn indiferent ce worker îl servește. Fișierele workerilor opriți
+rămân, ca totalurile să nu scadă; gauge-urile lor (pool-ul de conexiuni) nu
+mai sunt raportate. Directorul poate fi golit la fiecare deploy.
+
+Variabile de mediu:
+    METRICS_DIR              directorul fișierelor (implicit, în directorul temporar)
+    METRICS_FLUSH_SECONDS    cât de des își scrie un worker fișierul (implicit 2)
+    METRICS_TOKEN            dacă este setat, /metrics cere antetul
+                             "Authorization: Bearer <token>"; altfel /metrics
+                             răspunde doar cererilor de pe loopback (127.0.0.1, ::1)
+                             și cu 404 tuturor celorlalte
+"""
+
+import hmac
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from flask import Response, abort, g, request
+
+METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'worktracker-metrics'))
+FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', 2))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+LOOPBACK_ADDRESSES = ('127.0.0.1', '::1')
+
+# Limitele histogramelor, în secunde
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+EXPORT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+HELP = {
+    'worktracker_http_requests_total': ('counter', 'Cereri HTTP servite, pe rută, metodă și status'),
+    'worktracker_http_request_duration_seconds': ('histogram', 'Durata cererilor HTTP, pe rută și metodă'),
+    'worktracker_conditional_requests_total': ('counter', 'Răspunsuri cu ETag: not_modified (304) sau full, pe rută'),
+    'worktracker_export_duration_seconds': ('histogram', 'Durata exporturilor, de la început până la ultimul octet trimis'),
+    'worktracker_export_bytes_total': ('counter', 'Octeți trimiși de exporturi'),
+    'worktracker_password_hash_duration_seconds': ('histogram', 'Durata calculării hash-urilor de parolă'),
+    'worktracker_cache_requests_total': ('counter', 'Citiri din cache-urile în memorie, după rezultat'),
+    'worktracker_db_pool_size': ('gauge', 'Mărimea pool-ului de conexiuni, pe worker'),
+    'worktracker_db_pool_checked_out': ('gauge', 'Conexiuni folosite în acest moment, pe worker'),
+    'worktracker_db_pool_overflow': ('gauge', 'Conexiuni deschise peste mărimea pool-ului, pe worker'),
+}
+
+def _key(name, labels):
+    return json.dumps([name, sorted(labels.items())])
+
+class Registry:
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self.caches = {}
+        self.engine = None
+        self.last_flush = 0.0
+        self._path = None
+        self._path_pid = None
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, buckets=LATENCY_BUCKETS, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {'buckets': list(buckets), 'counts': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(buckets):
+                if seconds <= bound:
+                    histogram['counts'][index] += 1
+                    break
+            histogram['sum'] += seconds
+            histogram['count'] += 1
+
+    def snapshot(self):
+        """Starea worker-ului curent, în forma scrisă în fișier"""
+        with self._lock:
+            counters = dict(self.counters)
+            histograms = {key: dict(value, counts=list(value['counts'])) for key, value in self.histograms.items()}
+        for name, cache in self.caches.items():
+            counters[_key('worktracker_cache_requests_total', {'cache': name, 'result': 'hit'})] = cache.hits
+            counters[_key('worktracker_cache_requests_total', {'cache': name, 'result': 'miss'})] = cache.misses
+
+        gauges = {}
+        pool = getattr(self.engine, 'pool', None)
+        # Doar QueuePool (PostgreSQL) are mărime; SQLite pe fișier folosește NullPool
+        if pool is not None and hasattr(pool, 'checkedout') and hasattr(pool, 'size'):
+            labels = {'pid': str(os.getpid())}
+            gauges[_key('worktracker_db_pool_size', labels)] = pool.size()
+            gauges[_key('worktracker_db_pool_checked_out', labels)] = pool.checkedout()
+            gauges[_key('worktracker_db_pool_overflow', labels)] = pool.overflow()
+        return {'pid': os.getpid(), 'written': time.time(), 'counters': counters, 'histograms': histograms,
+                'gauges': gauges}
+
+    def path(self):
+        """Fișierul procesului curent; unul nou după fork (gunicorn --preload)"""
+        if self._path_pid != os.getpid():
+            self._path_pid = os.getpid()
+            self._path = os.path.join(METRICS_DIR, f'worker-{os.getpid()}-{uuid.uuid4().hex[:12]}.json')
+        return self._path
+
+    def flush(self):
+        """Scrie starea worker-ului în fișierul lui (scriere atomică)"""
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        path = self.path()
+        handle, temp_path = tempfile.mkstemp(dir=METRICS_DIR, suffix='.tmp')
+        with os.fdopen(handle, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(temp_path, path)
+        self.last_flush = time.monotonic()
+
+    def maybe_flush(self):
+        if time.monotonic() - self.last_flush >= FLUSH_SECONDS:
+            self.flush()
+
+registry = Registry()
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+def collect():
+    """Metricile tuturor workerilor, adunate"""
+    registry.flush()
+    counters = {}
+    histograms = {}
+    # pid -> (momentul scrierii, gauge-uri); pentru un pid refolosit contează fișierul cel mai nou
+    gauges_by_pid = {}
+    for filename in sorted(os.listdir(METRICS_DIR)):
+        if not (filename.startswith('worker-') and filename.endswith('.json')):
+            continue
+        try:
+            with open(os.path.join(METRICS_DIR, filename)) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for key, value in snapshot['counters'].items():
+            counters[key] = counters.get(key, 0) + value
+        for key, value in snapshot['histograms'].items():
+            total = histograms.get(key)
+            if total is None or total['buckets'] != value['buckets']:
+                histograms[key] = value
+                continue
+            total['counts'] = [a + b for a, b in zip(total['counts'], value['counts'])]
+            total['sum'] += value['sum']
+            total['count'] += value['count']
+        latest = gauges_by_pid.get(snapshot['pid'])
+        if latest is None or latest[0] < snapshot.get('written', 0):
+            gauges_by_pid[snapshot['pid']] = (snapshot.get('written', 0), snapshot['gauges'])
+
+    gauges = {}
+    for pid, (_, values) in gauges_by_pid.items():
+        if _pid_alive(pid):
+            gauges.update(values)
+    return counters, histograms, gauges
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+               for name, value in labels)
+    return '{' + ','.join(escaped) + '}'
+
+def render_text():
+    """Metricile în formatul text Prometheus (version 0.0.4)"""
+    counters, histograms, gauges = collect()
+    by_name = {}
+    for kind, values in (('counter', counters), ('gauge', gauges), ('histogram', histograms)):
+        for key, value in values.items():
+            name, labels = json.loads(key)
+            by_name.setdefault(name, []).append(([tuple(pair) for pair in labels], value))
+
+    lines = []
+    for name in sorted(by_name):
+        kind, description = HELP.get(name, ('untyped', name))
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in sorted(by_name[name], key=lambda item: item[0]):
+            if kind != 'histogram':
+                lines.append(f'{name}{_format_labels(labels)} {value}')
+                continue
+            cumulative = 0
+            for bound, count in zip(value['buckets'], value['counts']):
+                cumulative += count
+                lines.append(f'{name}_bucket{_format_labels(labels + [("le", repr(float(bound)))])} {cumulative}')
+            lines.append(f'{name}_bucket{_format_labels(labels + [("le", "+Inf")])} {value["count"]}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {value["sum"]}')
+            lines.append(f'{name}_count{_format_labels(labels)} {value["count"]}')
+    return '\n'.join(lines) + '\n'
+
+@contextmanager
+def timed(name, buckets=LATENCY_BUCKETS, **labels):
+    """Măsoară durata blocului într-o histogramă"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(name, time.perf_counter() - started, buckets=buckets, **labels)
+
+def track_export(chunks, dataset, file_format, started):
+    """
+    Trimite mai departe bucățile unui export, numărând octeții; durata este
+    înregistrată când ultimul octet a fost trimis (sau clientul a renunțat).
+    """
+    sent = 0
+    try:
+        for chunk in chunks:
+            sent += len(chunk)
+            yield chunk
+    finally:
+        registry.observe('worktracker_export_duration_seconds', time.perf_counter() - started,
+                         buckets=EXPORT_BUCKETS, dataset=dataset, format=file_format)
+        registry.inc('worktracker_export_bytes_total', sent, dataset=dataset, format=file_format)
+
+def record_conditional(not_modified):
+    registry.inc('worktracker_conditional_requests_total', endpoint=request.endpoint or 'none',
+                 result='not_modified' if not_modified else 'full')
+
+def metrics_allowed():
+    """Cererea are token-ul corect sau, fără token configurat, vine de pe loopback"""
+    if METRICS_TOKEN:
+        return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {METRICS_TOKEN}')
+    return request.remote_addr in LOOPBACK_ADDRESSES
+
+def init_app(app, engine, caches=None):
+    """Înregistrează colectarea metricilor și ruta /metrics"""
+    registry.engine = engine
+    registry.caches.update(caches or {})
+
+    @app.before_request
+    def start_metrics_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            endpoint = request.endpoint or 'none'
+            registry.inc('worktracker_http_requests_total', endpoint=endpoint, method=request.method,
+                         status=str(response.status_code))
+            registry.observe('worktracker_http_request_duration_seconds', time.perf_counter() - started,
+                             endpoint=endpoint, method=request.method)
+            registry.maybe_flush()
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        if not metrics_allowed():
+            abort(404)
+        return Response(render_text(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,391 @@
+"""
+Migrarea fișierelor JSON vechi în baza de date
+
+Aplicația de linie de comandă (main.py) păstra datele în users.json,
+activities.json, leaves.json și expenses.json. Scriptul le încarcă în tabelele
+aplicației web:
+  - fișierele sunt citite element cu element (obiectele din dicționarul sau
+    lista de pe primul nivel), fără să fie încărcate întregi în memorie;
+  - datele de forma 2025-1-07 și id-urile salvate ca text ("2") sunt normalizate;
+  - utilizatorii sunt potriviți după nume sau email cu cei existenți, iar cei
+    noi își păstrează hash-ul parolei;
+  - activitățile fără user_id sunt atribuite utilizatorului dat cu
+    --default-user (altfel sunt sărite);
+  - rândurile care există deja în baza de date nu sunt inserate a doua oară
+    (cheltuielile după UUID, restul după conținut), deci scriptul poate fi
+    rulat de mai multe ori; existența este verificată lot cu lot, cu o
+    interogare pentru utilizatorii și zilele din lot.
+
+Utilizare:
+    python migrate_legacy_json.py
+    python migrate_legacy_json.py --data-dir vechi/ --default-user admin
+"""
+
+import argparse
+import json
+import os
+import time
+from sqlalchemy import insert, and_, or_
+from database import engine, SessionLocal
+from migrations import upgrade
+from models import User, Activity, Leave, Expense
+from activity_import import CHUNK_SIZE, parse_activity, parse_date, insert_chunk
+from data_version import bump_data_version
+
+READ_SIZE = 64 * 1024
+SEPARATORS = tuple(' \t\r\n,:]}')
+
+def iter_json_items(path, read_size=READ_SIZE):
+    """
+    Produce elementele de pe primul nivel al unui fișier JSON, pe rând.
+
+    Pentru un obiect produce perechi (cheie, valoare), pentru o listă perechi
+    (index, valoare). Fișierul este citit în bucăți de `read_size` caractere și
+    fiecare element este decodat cu JSONDecoder.raw_decode imediat ce a fost
+    citit complet.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding='utf-8-sig') as f:
+        buffer = ''
+        position = 0
+        eof = False
+
+        def fill():
+            nonlocal buffer, position, eof
+            chunk = f.read(read_size)
+            if not chunk:
+                eof = True
+            buffer = buffer[position:] + chunk
+            position = 0
+
+        def skip_whitespace():
+            nonlocal position
+            while True:
+                while position < len(buffer) and buffer[position] in ' \t\r\n':
+                    position += 1
+                if position < len(buffer) or eof:
+                    return
+                fill()
+
+        def decode():
+            # Un element este acceptat doar dacă după el urmează un separator deja
+            # citit (altfel un număr ca 1.5e3 ar putea fi decodat pe jumătate, ca 1.5)
+            nonlocal position
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, position)
+                    if eof or buffer[end:end + 1] in SEPARATORS:
+                        position = end
+                        return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                fill()
+
+        def expect(characters):
+            nonlocal position
+            skip_whitespace()
+            if position >= len(buffer) or buffer[position] not in characters:
+                raise ValueError(f'{path}: JSON neașteptat, se aștepta unul dintre {characters!r}')
+            position += 1
+            return buffer[position - 1]
+
+        fill()
+        opening = expect('[{')
+        closing = ']' if opening == '[' else '}'
+        index = 0
+        skip_whitespace()
+        if buffer[position:position + 1] == closing:
+            return
+        while True:
+            skip_whitespace()
+            if opening == '{':
+                key = decode()
+                expect(':')
+            else:
+                key = index
+            skip_whitespace()
+            yield key, decode()
+            index += 1
+            if expect(',' + closing) == closing:
+                return
+
+def legacy_int(value):
+    """Id-urile vechi apar ca numere, ca text ("2") sau lipsesc (None)"""
+    if value is None or value == '':
+        return None
+    return int(value)
+
+class Stats:
+    def __init__(self, name):
+        self.name = name
+        self.read = 0
+        self.inserted = 0
+        self.existing = 0
+        self.invalid = 0
+        self.started = time.perf_counter()
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        rate = self.read / elapsed if elapsed > 0 else 0
+        print(f'{self.name:<11} {self.read:>7} citite, {self.inserted:>7} inserate, '
+              f'{self.existing:>7} existente, {self.invalid:>5} invalide  '
+              f'{elapsed:7.2f} s  {rate:10.0f} rânduri/s')
+
+def migrate_users(db, path):
+    """Inserează utilizatorii noi și întoarce maparea id vechi -> id în baza de date"""
+    stats = Stats('utilizatori')
+    by_username = {}
+    by_email = {}
+    for user_id, username, email in db.query(User.id, User.username, User.email):
+        by_username[username] = user_id
+        if email:
+            by_email[email.lower()] = user_id
+
+    id_map = {}
+    for key, raw in iter_json_items(path):
+        stats.read += 1
+        username = (raw.get('username') or '').strip()
+        email = (raw.get('email') or '').strip()
+        if not username or not raw.get('password_hash'):
+            stats.invalid += 1
+            continue
+        user_id = by_username.get(username) or by_email.get(email.lower())
+        if user_id is not None:
+            stats.existing += 1
+        else:
+            user = User(username=username, email=email or None, password=raw['password_hash'], is_admin=False)
+            db.add(user)
+            db.flush()
+            user_id = user.id
+            by_username[username] = user_id
+            if email:
+                by_email[email.lower()] = user_id
+            stats.inserted += 1
+        id_map[legacy_int(raw.get('user_id', key))] = user_id
+    db.commit()
+    stats.report()
+    return id_map
+
+def resolve_user(raw_user_id, id_map, default_user_id):
+    """Id-ul din baza de date pentru un user_id vechi; None dacă nu poate fi stabilit"""
+    try:
+        user_id = legacy_int(raw_user_id)
+    except (TypeError, ValueError):
+        return None
+    if user_id is None:
+        return default_user_id
+    return id_map.get(user_id)
+
+def new_chunks(db, rows, key, stored_keys, stats):
+    """
+    Grupează rândurile în loturi și lasă în fiecare lot doar rândurile noi.
+
+    Duplicatele din fișier sunt recunoscute după cheile văzute în această
+    rulare, iar rândurile deja existente în baza de date printr-o interogare
+    per lot: `stored_keys(db, chunk)` întoarce cheile din baza de date care ar
+    putea coincide cu cele din lot. În memorie rămân doar cheile rândurilor
+    citite din fișier, nu conținutul tabelelor.
+    """
+    seen = set()
+
+    def without_stored(chunk):
+        stored = stored_keys(db, chunk)
+        fresh = [values for values in chunk if key(values) not in stored]
+        stats.existing += len(chunk) - len(fresh)
+        return fresh
+
+    chunk = []
+    for values in rows:
+        row_key = key(values)
+        if row_key in seen:
+            stats.existing += 1
+            continue
+        seen.add(row_key)
+        chunk.append(values)
+        if len(chunk) >= CHUNK_SIZE:
+            fresh = without_stored(chunk)
+            if fresh:
+                yield fresh
+            chunk = []
+    if chunk:
+        fresh = without_stored(chunk)
+        if fresh:
+            yield fresh
+
+def activity_key(values):
+    return (values['user_id'], values['date'], values['client'] or '', values['project'] or '',
+            values['activity_type'] or '', round(values['hours'] or 0, 2), values['achievements'] or '')
+
+def stored_activity_keys(db, chunk):
+    """Cheile activităților existente ale utilizatorilor din lot, în zilele din lot"""
+    columns = (Activity.user_id, Activity.date, Activity.client, Activity.project,
+               Activity.activity_type, Activity.hours, Activity.achievements)
+    query = db.query(*columns).filter(
+        Activity.user_id.in_({values['user_id'] for values in chunk}),
+        Activity.date.in_({values['date'] for values in chunk})
+    )
+    return {activity_key(row._mapping) for row in query}
+
+def migrate_activities(db, path, id_map, default_user_id):
+    stats = Stats('activități')
+    unassigned = 0
+
+    def rows():
+        nonlocal unassigned
+        for _, raw in iter_json_items(path):
+            stats.read += 1
+            user_id = resolve_user(raw.get('user_id'), id_map, default_user_id)
+            if user_id is None:
+                unassigned += raw.get('user_id') is None
+                stats.invalid += 1
+                continue
+            try:
+                yield parse_activity(raw, user_id)
+            except ValueError:
+                stats.invalid += 1
+
+    for chunk in new_chunks(db, rows(), activity_key, stored_activity_keys, stats):
+        insert_chunk(db, chunk)
+        db.commit()
+        stats.inserted += len(chunk)
+    stats.report()
+    if unassigned:
+        print(f'  {unassigned} activități fără user_id au fost sărite; folosiți --default-user pentru a le importa')
+
+def bulk_load(db, table, chunks, stats):
+    """Inserează loturile, cu câte un executemany și un commit pe lot"""
+    for chunk in chunks:
+        db.execute(insert(table), chunk)
+        bump_data_version(db, {values['user_id'] for values in chunk})
+        db.commit()
+        stats.inserted += len(chunk)
+
+def leave_key(values):
+    return (values['user_id'], values['start_date'], values['end_date'],
+            values['leave_type'] or '', values['description'] or '')
+
+def stored_leave_keys(db, chunk):
+    """Cheile absențelor existente ale utilizatorilor din lot, care încep în zilele din lot"""
+    query = db.query(Leave.user_id, Leave.start_date, Leave.end_date, Leave.leave_type, Leave.description).filter(
+        Leave.user_id.in_({values['user_id'] for values in chunk}),
+        Leave.start_date.in_({values['start_date'] for values in chunk})
+    )
+    return {leave_key(row._mapping) for row in query}
+
+def migrate_leaves(db, path, id_map, default_user_id):
+    stats = Stats('absențe')
+
+    def rows():
+        for _, raw in iter_json_items(path):
+            stats.read += 1
+            user_id = resolve_user(raw.get('user_id'), id_map, default_user_id)
+            try:
+                start_date = parse_date(raw.get('start_date'))
+                end_date = parse_date(raw.get('end_date'))
+            except ValueError:
+                start_date = end_date = None
+            if user_id is None or start_date is None or end_date < start_date:
+                stats.invalid += 1
+                continue
+            yield {
+                'user_id': user_id,
+                'start_date': start_date,
+                'end_date': end_date,
+                'leave_type': raw.get('leave_type') or '',
+                'description': raw.get('description') or '',
+                'status': raw.get('status') or 'în așteptare',
+            }
+
+    bulk_load(db, Leave.__table__, new_chunks(db, rows(), leave_key, stored_leave_keys, stats), stats)
+    stats.report()
+
+def expense_key(values):
+    """Cheltuielile sunt identificate după UUID; cele fără UUID, după conținut"""
+    return values['external_id'] or (values['user_id'], values['date'], values['project'] or '',
+                                     round(values['amount'] or 0, 2), values['description'] or '')
+
+def stored_expense_keys(db, chunk):
+    """Cheile cheltuielilor existente cu UUID-urile din lot sau ale utilizatorilor din lot, în zilele din lot"""
+    columns = (Expense.external_id, Expense.user_id, Expense.date, Expense.project, Expense.amount, Expense.description)
+    external_ids = {values['external_id'] for values in chunk if values['external_id']}
+    query = db.query(*columns).filter(or_(
+        Expense.external_id.in_(external_ids),
+        and_(Expense.user_id.in_({values['user_id'] for values in chunk}),
+             Expense.date.in_({values['date'] for values in chunk}))
+    ))
+    return {expense_key(row._mapping) for row in query}
+
+def migrate_expenses(db, path, id_map, default_user_id):
+    stats = Stats('cheltuieli')
+
+    def rows():
+        for _, raw in iter_json_items(path):
+            stats.read += 1
+            user_id = resolve_user(raw.get('user_id'), id_map, default_user_id)
+            try:
+                day = parse_date(raw.get('date'))
+                amount = float(raw.get('amount'))
+            except (TypeError, ValueError):
+                day = None
+            if user_id is None or day is None:
+                stats.invalid += 1
+                continue
+            yield {
+                'user_id': user_id,
+                'date': day,
+                'project': raw.get('project') or '',
+                'amount': amount,
+                'description': raw.get('description') or '',
+                'category': raw.get('category') or '',
+                'status': raw.get('status') or 'în așteptare',
+                'external_id': str(raw.get('expense_id') or '').strip() or None,
+            }
+
+    bulk_load(db, Expense.__table__, new_chunks(db, rows(), expense_key, stored_expense_keys, stats), stats)
+    stats.report()
+
+def find_user_id(db, value):
+    """Id-ul utilizatorului dat prin id sau nume, pentru --default-user"""
+    query = db.query(User.id)
+    user_id = (query.filter(User.id == int(value)) if value.isdigit() else query.filter(User.username == value)).scalar()
+    if user_id is None:
+        raise SystemExit(f'Utilizatorul {value!r} nu există')
+    return user_id
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data-dir', default=os.path.dirname(os.path.abspath(__file__)),
+                        help='Directorul cu fișierele JSON (implicit, directorul aplicației)')
+    parser.add_argument('--default-user',
+                        help='Utilizatorul (nume sau id) căruia îi sunt atribuite înregistrările fără user_id')
+    args = parser.parse_args()
+
+    # Coloana expenses.external_id vine dintr-o migrație
+    upgrade(engine)
+
+    db = SessionLocal()
+    try:
+        default_user_id = find_user_id(db, args.default_user) if args.default_user else None
+
+        started = time.perf_counter()
+        id_map = {}
+        for name, migrate in [
+            ('users.json', None),
+            ('activities.json', migrate_activities),
+            ('leaves.json', migrate_leaves),
+            ('expenses.json', migrate_expenses),
+        ]:
+            path = os.path.join(args.data_dir, name)
+            if not os.path.exists(path):
+                print(f'{name} lipsește, este sărit')
+            elif migrate is None:
+                id_map = migrate_users(db, path)
+            else:
+                migrate(db, path, id_map, default_user_id)
+        print(f'Migrare încheiată în {time.perf_counter() - started:.2f} s')
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Migrații versionate pentru schema bazei de date
+
+`Base.metadata.create_all` creează doar tabelele lipsă: nu adaugă indecși sau
+coloane noi pe tabelele existente. Acest script ține evidența versiunii schemei
+în tabela `schema_migrations` și aplică, în ordine, migrațiile care lipsesc.
+Funcționează atât pe SQLite (local), cât și pe PostgreSQL (Heroku).
+
+Utilizare:
+    python migrations.py            # aplică migrațiile lipsă
+    python migrations.py status     # afișează migrațiile aplicate / în așteptare
+"""
+
+import sys
+from datetime import datetime
+from sqlalchemy import text, inspect
+from database import engine, Base
+import models  # înregistrează modelele în Base.metadata
+
+def _create_index(name, table, columns):
+    return f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+
+def migration_0001_composite_indexes(connection):
+    """Indecși compuși pentru interogările după utilizator și dată/client/proiect"""
+    for name, table, columns in [
+        ("ix_activities_user_date", "activities", ["user_id", "date"]),
+        ("ix_activities_user_client_date", "activities", ["user_id", "client", "date"]),
+        ("ix_activities_user_project_date", "activities", ["user_id", "project", "date"]),
+        ("ix_leaves_user_start_date", "leaves", ["user_id", "start_date"]),
+        ("ix_expenses_user_date", "expenses", ["user_id", "date"]),
+    ]:
+        connection.execute(text(_create_index(name, table, columns)))
+
+def migration_0002_activity_daily_rollup(connection):
+    """Tabela activity_daily_rollup, populată din activitățile existente"""
+    from rollup import ROLLUP, rebuild_rollup
+
+    ROLLUP.create(connection, checkfirst=True)
+    rebuild_rollup(connection)
+
+def migration_0003_expense_external_id(connection):
+    """Coloana expenses.external_id (UUID-ul din expenses.json), cu index unic"""
+    columns = {column["name"] for column in inspect(connection).get_columns("expenses")}
+    if "external_id" not in columns:
+        connection.execute(text("ALTER TABLE expenses ADD COLUMN external_id VARCHAR"))
+    connection.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_expenses_external_id ON expenses (external_id)"
+    ))
+
+def migration_0004_user_data_versions(connection):
+    """Tabela user_data_versions; utilizatorii existenți pornesc de la versiunea 0"""
+    models.UserDataVersion.__table__.create(connection, checkfirst=True)
+
+# Lista migrațiilor, în ordinea în care trebuie aplicate. Nu modificați o
+# migrație deja publicată; adăugați una nouă cu versiunea următoare.
+MIGRATIONS = [
+    (1, "Indecși compuși pentru activități, absențe și cheltuieli", migration_0001_composite_indexes),
+    (2, "Rollup zilnic al orelor de activitate", migration_0002_activity_daily_rollup),
+    (3, "Identificator extern pentru cheltuieli", migration_0003_expense_external_id),
+    (4, "Versiunea datelor fiecărui utilizator (ETag)", migration_0004_user_data_versions),
+]
+
+def _ensure_version_table(connection):
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, "
+        "description VARCHAR, "
+        "applied_at VARCHAR)"
+    ))
+
+def applied_versions(connection):
+    """Versiunile deja aplicate pe baza de date"""
+    if not inspect(connection).has_table("schema_migrations"):
+        return set()
+    return {row[0] for row in connection.execute(text("SELECT version FROM schema_migrations"))}
+
+def upgrade(bind=engine):
+    """
+    Aduce baza de date la ultima versiune a schemei.
+
+    Tabelele lipsă sunt create din modele, apoi fiecare migrație în așteptare
+    rulează în propria tranzacție, împreună cu înregistrarea versiunii ei.
+    Întoarce lista versiunilor aplicate acum.
+    """
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as connection:
+        _ensure_version_table(connection)
+        done = applied_versions(connection)
+
+    applied = []
+    for version, description, migrate in MIGRATIONS:
+        if version in done:
+            continue
+        with bind.begin() as connection:
+            migrate(connection)
+            connection.execute(
+                text("INSERT INTO schema_migrations (version, description, applied_at) "
+                     "VALUES (:version, :description, :applied_at)"),
+                {"version": version, "description": description,
+                 "applied_at": datetime.utcnow().isoformat(timespec="seconds")}
+            )
+        print(f"Migrația {version:04d} aplicată: {description}")
+        applied.append(version)
+    return applied
+
+def pending_versions(bind=engine):
+    """Versiunile migrațiilor care nu au fost încă aplicate"""
+    with bind.connect() as connection:
+        done = applied_versions(connection)
+    return [version for version, _, _ in MIGRATIONS if version not in done]
+
+def require_current_schema(bind=engine):
+    """Ridică RuntimeError, cu comanda care rezolvă problema, dacă există migrații neaplicate"""
+    pending = pending_versions(bind)
+    if pending:
+        raise RuntimeError(
+            f"Baza de date nu este la zi: lipsesc migrațiile {', '.join(f'{v:04d}' for v in pending)}. "
+            "Rulați: python migrations.py upgrade"
+        )
+
+def status(bind=engine):
+    with bind.connect() as connection:
+        done = applied_versions(connection)
+    for version, description, _ in MIGRATIONS:
+        state = "aplicată" if version in done else "în așteptare"
+        print(f"{version:04d} [{state}] {description}")
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "upgrade"
+    if command == "upgrade":
+        applied = upgrade()
+        print(f"Baza de date este la zi ({len(applied)} migrații aplicate acum).")
+    elif command == "status":
+        status()
+    else:
+        print(f"Comandă necunoscută: {command}. Folosiți 'upgrade' sau 'status'.")
+        sys.exit(1)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, DateTime, Boolean, Index
 from sqlalchemy.orm import relationship
 from database import Base
 import datetime
@@ -17,6 +17,12 @@ class User(Base):
 
 class Activity(Base):
     __tablename__ = "activities"
+    # Indecși pentru interogările frecvente: mereu după user_id, apoi dată/client/proiect
+    __table_args__ = (
+        Index("ix_activities_user_date", "user_id", "date"),
+        Index("ix_activities_user_client_date", "user_id", "client", "date"),
+        Index("ix_activities_user_project_date", "user_id", "project", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -29,8 +35,36 @@ class Activity(Base):
     hours = Column(Float)
     user = relationship("User", back_populates="activities")
 
+class ActivityDailyRollup(Base):
+    """
+    Orele însumate pe zi pentru fiecare combinație utilizator/client/proiect/tip.
+
+    Tabela este actualizată în aceeași tranzacție cu activitățile (vezi rollup.py),
+    astfel încât rapoartele și dashboard-ul citesc din ea în loc să parcurgă
+    toate activitățile. Valorile lipsă pentru client/proiect/tip sunt salvate ca ''.
+    """
+    __tablename__ = "activity_daily_rollup"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    client = Column(String, primary_key=True, default="")
+    project = Column(String, primary_key=True, default="")
+    activity_type = Column(String, primary_key=True, default="")
+    hours = Column(Float, nullable=False, default=0)
+    activity_count = Column(Integer, nullable=False, default=0)
+
+class UserDataVersion(Base):
+    """Versiunea datelor unui utilizator, folosită pentru ETag (vezi data_version.py)"""
+    __tablename__ = "user_data_versions"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
 class Leave(Base):
     __tablename__ = "leaves"
+    __table_args__ = (
+        Index("ix_leaves_user_start_date", "user_id", "start_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -43,6 +77,9 @@ class Leave(Base):
 
 class Expense(Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        Index("ix_expenses_user_date", "user_id", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -52,6 +89,8 @@ class Expense(Base):
     description = Column(String)
     category = Column(String)
     status = Column(String, default="în așteptare")
+    # Identificatorul (UUID) cheltuielii în expenses.json, pentru importul vechilor date
+    external_id = Column(String, unique=True, index=True)
     user = relationship("User", back_populates="expenses")
 
 # Funcții helper pentru conversia între modele și dicționare
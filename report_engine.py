@@ -0,0 +1,151 @@
+"""
+Motor de rapoarte pentru activități
+
+Toate rapoartele (săptămânal, lunar, pe client, pe proiect) sunt aceeași
+interogare cu alte filtre și alte dimensiuni de grupare. Filtrele și
+dimensiunile sunt compilate într-o singură interogare SQL (UNION ALL între
+rândul de totaluri și câte un GROUP BY pentru fiecare dimensiune).
+
+Agregatele se calculează din tabela activity_daily_rollup, așa că atât
+rândurile citite, cât și cele întoarse depind de numărul de zile și valori
+distincte, nu de câte activități există. Doar lista detaliată citește
+tabela de activități.
+"""
+
+import base64
+import json
+from datetime import date
+from sqlalchemy import func, literal, null, cast, String, union_all, select, tuple_
+from models import Activity, ActivityDailyRollup
+
+# Dimensiunile după care se poate grupa un raport
+DIMENSIONS = ('client', 'project', 'activity_type', 'date', 'user_id')
+
+# Câmpurile unei activități care pot fi cerute în listări (fields=...); implicit toate,
+# aceleași pentru lista completă și pentru pagini
+ACTIVITY_FIELDS = ('id', 'user_id', 'date', 'client', 'project', 'activity_type', 'hours', 'achievements', 'challenges')
+
+def build_criteria(columns, user_ids=None, start_date=None, end_date=None,
+                   client=None, project=None, activity_type=None):
+    """Construiește condițiile WHERE pentru un set de filtre"""
+    criteria = []
+    if user_ids is not None:
+        criteria.append(columns.user_id.in_(list(user_ids)))
+    if start_date is not None:
+        criteria.append(columns.date >= start_date)
+    if end_date is not None:
+        criteria.append(columns.date <= end_date)
+    if client is not None:
+        criteria.append(columns.client == client)
+    if project is not None:
+        criteria.append(columns.project == project)
+    if activity_type is not None:
+        criteria.append(columns.activity_type == activity_type)
+    return criteria
+
+def compile_report_query(filters, group_by=('client', 'project')):
+    """
+    Compilează filtrele și dimensiunile într-o singură interogare.
+
+    Fiecare rând are forma (dimension, key, hours): un rând 'total' cu orele,
+    zilele lucrate și proiectele distincte, apoi câte un rând pentru fiecare
+    valoare a fiecărei dimensiuni cerute.
+    """
+    columns = ActivityDailyRollup.__table__.c
+    criteria = build_criteria(columns, **filters)
+
+    parts = [
+        select(
+            literal('total').label('dimension'),
+            cast(null(), String).label('key'),
+            func.coalesce(func.sum(columns.hours), 0).label('hours'),
+            func.count(func.distinct(columns.date)).label('working_days'),
+            func.count(func.distinct(columns.project)).label('unique_projects')
+        ).where(*criteria)
+    ]
+    for dimension in group_by:
+        if dimension not in DIMENSIONS:
+            raise ValueError(f'Dimensiune de grupare necunoscută: {dimension}')
+        column = columns[dimension]
+        parts.append(
+            select(
+                literal(dimension).label('dimension'),
+                cast(column, String).label('key'),
+                func.sum(columns.hours).label('hours'),
+                literal(0).label('working_days'),
+                literal(0).label('unique_projects')
+            ).where(*criteria).group_by(column)
+        )
+    return union_all(*parts)
+
+def run_report(db, filters, group_by=('client', 'project')):
+    """
+    Execută raportul și întoarce totalurile împreună cu orele pe fiecare dimensiune.
+
+    Valorile goale ale dimensiunilor (client sau proiect necompletat) nu apar
+    în defalcări, dar orele lor sunt incluse în total, iar proiectul
+    necompletat este numărat în unique_projects ca un proiect distinct.
+    """
+    report = {
+        'total_hours': 0,
+        'working_days': 0,
+        'unique_projects': 0,
+        'breakdowns': {dimension: {} for dimension in group_by}
+    }
+    for dimension, key, hours, working_days, unique_projects in db.execute(compile_report_query(filters, group_by)):
+        if dimension == 'total':
+            report['total_hours'] = hours
+            report['working_days'] = working_days
+            report['unique_projects'] = unique_projects
+        elif key:
+            report['breakdowns'][dimension][key] = hours
+    return report
+
+def activity_dict(fields, values):
+    """O activitate dintr-un rând cu coloanele `fields`, cu data în format ISO"""
+    activity = dict(zip(fields, values))
+    if 'date' in activity:
+        activity['date'] = activity['date'].isoformat()
+    return activity
+
+def list_activities(db, filters, fields=ACTIVITY_FIELDS):
+    """
+    Lista detaliată a activităților care corespund filtrelor, cele mai recente
+    primele (ordonate după dată și id), în aceeași formă ca page_activities.
+    """
+    columns = [getattr(Activity, field) for field in fields]
+    query = db.query(*columns).filter(*build_criteria(Activity, **filters))
+    return [activity_dict(fields, row) for row in query.order_by(Activity.date.desc(), Activity.id.desc())]
+
+def encode_cursor(activity_date, activity_id):
+    """Poziția după ultima activitate dintr-o pagină, ca text opac pentru client"""
+    raw = json.dumps([activity_date.isoformat(), activity_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """(dată, id) dintr-un cursor produs de encode_cursor; ridică ValueError dacă este invalid"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        activity_date, activity_id = json.loads(raw)
+        return date.fromisoformat(activity_date), int(activity_id)
+    except (TypeError, ValueError):
+        raise ValueError('Cursor invalid')
+
+def page_activities(db, filters, limit, cursor=None, fields=ACTIVITY_FIELDS):
+    """
+    O pagină de activități, cele mai recente primele (ordonate după dată și id).
+
+    Paginarea folosește poziția ultimei activități din pagina anterioară
+    (keyset), nu OFFSET: fiecare pagină este o citire de `limit` rânduri din
+    indexul (user_id, date), indiferent cât de departe în istoric se află.
+    Întoarce (activități, cursorul paginii următoare sau None).
+    """
+    columns = [getattr(Activity, field) for field in fields]
+    query = db.query(Activity.date, Activity.id, *columns).filter(*build_criteria(Activity, **filters))
+    if cursor is not None:
+        query = query.filter(tuple_(Activity.date, Activity.id) < tuple_(*decode_cursor(cursor)))
+    rows = query.order_by(Activity.date.desc(), Activity.id.desc()).limit(limit + 1).all()
+
+    activities = [activity_dict(fields, row[2:]) for row in rows[:limit]]
+    next_cursor = encode_cursor(rows[limit - 1][0], rows[limit - 1][1]) if len(rows) > limit else None
+    return activities, next_cursor
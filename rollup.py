@@ -0,0 +1,126 @@
+"""
+Întreținerea tabelei activity_daily_rollup
+
+Fiecare scriere în `activities` trebuie să aplice aceeași modificare și în
+rollup, în aceeași tranzacție: `record_activity` pentru un singur rând,
+`apply_deltas` pentru importuri în masă. `rebuild_rollup` reconstruiește
+tabela din activități (backfill sau reparare).
+
+Utilizare:
+    python rollup.py rebuild            # reconstruiește pentru toți utilizatorii
+    python rollup.py rebuild 3 7        # doar pentru utilizatorii 3 și 7
+"""
+
+import sys
+from sqlalchemy import func, select, delete, insert
+from sqlalchemy.dialects import sqlite, postgresql
+from models import Activity, ActivityDailyRollup
+
+ROLLUP = ActivityDailyRollup.__table__
+
+def rollup_key(user_id, date, client, project, activity_type):
+    """Cheia rândului din rollup; valorile lipsă devin '' ca să poată face parte din cheia primară"""
+    return (user_id, date, client or "", project or "", activity_type or "")
+
+def add_delta(deltas, activity, sign=1):
+    """Adaugă o activitate (obiect sau dicționar) la un set de modificări pentru rollup"""
+    if isinstance(activity, dict):
+        values = activity
+    else:
+        values = {column: getattr(activity, column)
+                  for column in ("user_id", "date", "client", "project", "activity_type", "hours")}
+    if values["user_id"] is None or values["date"] is None:
+        return deltas
+    key = rollup_key(values["user_id"], values["date"], values.get("client"),
+                     values.get("project"), values.get("activity_type"))
+    hours, count = deltas.get(key, (0.0, 0))
+    deltas[key] = (hours + sign * (values.get("hours") or 0), count + sign)
+    return deltas
+
+def _upsert(bind):
+    """INSERT ... ON CONFLICT DO UPDATE pentru dialectul curent (SQLite sau PostgreSQL)"""
+    dialect = postgresql if bind.dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(ROLLUP)
+    return statement.on_conflict_do_update(
+        index_elements=[ROLLUP.c.user_id, ROLLUP.c.date, ROLLUP.c.client,
+                        ROLLUP.c.project, ROLLUP.c.activity_type],
+        set_={
+            "hours": ROLLUP.c.hours + statement.excluded.hours,
+            "activity_count": ROLLUP.c.activity_count + statement.excluded.activity_count,
+        }
+    )
+
+def apply_deltas(db, deltas):
+    """
+    Aplică un set de modificări în rollup, într-o singură instrucțiune executemany.
+
+    Nu face commit: apelantul decide tranzacția, ca rollup-ul să rămână
+    sincronizat cu activitățile.
+    """
+    if not deltas:
+        return
+    rows = [
+        {"user_id": user_id, "date": date, "client": client, "project": project,
+         "activity_type": activity_type, "hours": hours, "activity_count": count}
+        for (user_id, date, client, project, activity_type), (hours, count) in deltas.items()
+    ]
+    db.execute(_upsert(db.get_bind()), rows)
+    if any(count < 0 for _, count in deltas.values()):
+        # Zilele din care s-au șters toate activitățile nu mai au ce căuta în rollup
+        user_ids = {key[0] for key in deltas}
+        db.execute(delete(ROLLUP).where(
+            ROLLUP.c.user_id.in_(user_ids),
+            ROLLUP.c.activity_count <= 0
+        ))
+
+def record_activity(db, activity, sign=1):
+    """Actualizează rollup-ul pentru o activitate adăugată (sign=1) sau ștearsă (sign=-1)"""
+    apply_deltas(db, add_delta({}, activity, sign))
+
+def rebuild_rollup(bind, user_ids=None):
+    """
+    Reconstruiește rollup-ul din tabela de activități, direct în SQL.
+
+    `bind` poate fi o sesiune sau o conexiune; nu face commit.
+    """
+    activities = Activity.__table__.c
+    criteria = [activities.user_id.isnot(None), activities.date.isnot(None)]
+    cleanup = delete(ROLLUP)
+    if user_ids is not None:
+        criteria.append(activities.user_id.in_(list(user_ids)))
+        cleanup = cleanup.where(ROLLUP.c.user_id.in_(list(user_ids)))
+
+    grouped = [
+        activities.user_id,
+        activities.date,
+        func.coalesce(activities.client, ""),
+        func.coalesce(activities.project, ""),
+        func.coalesce(activities.activity_type, ""),
+    ]
+    source = select(
+        *grouped,
+        func.coalesce(func.sum(activities.hours), 0),
+        func.count()
+    ).where(*criteria).group_by(*grouped)
+
+    bind.execute(cleanup)
+    bind.execute(insert(ROLLUP).from_select(
+        ["user_id", "date", "client", "project", "activity_type", "hours", "activity_count"],
+        source
+    ))
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    if len(sys.argv) < 2 or sys.argv[1] != "rebuild":
+        print("Utilizare: python rollup.py rebuild [user_id ...]")
+        sys.exit(1)
+    user_ids = [int(value) for value in sys.argv[2:]] or None
+    db = SessionLocal()
+    try:
+        rebuild_rollup(db, user_ids)
+        db.commit()
+        total = db.query(func.count()).select_from(ActivityDailyRollup).scalar()
+        print(f"Rollup reconstruit: {total} rânduri.")
+    finally:
+        db.close()
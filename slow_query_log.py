@@ -0,0 +1,237 @@
+"""
+Jurnalul interogărilor lente
+
+Orice instrucțiune SQL executată prin engine care durează peste prag este
+scrisă ca o linie JSON în SLOW_QUERY_LOG, împreună cu parametrii, durata,
+ruta care a executat-o și planul de execuție, obținut imediat după
+interogare cu EXPLAIN QUERY PLAN (SQLite) sau EXPLAIN (ANALYZE off)
+(PostgreSQL), adică fără a o executa a doua oară. Planul este cerut pe
+cursorul DBAPI, ocolind evenimentele engine-ului, deci nu poate ajunge el
+însuși în jurnal.
+
+Variabile de mediu:
+    SLOW_QUERY_MS     pragul în milisecunde (implicit 50; "off" dezactivează jurnalul)
+    SLOW_QUERY_LOG    fișierul jurnalului (implicit slow_queries.jsonl lângă aplicație)
+    SLOW_QUERY_LOG_PARAMS
+                      "1" scrie valorile parametrilor; implicit sunt scrise doar
+                      tipul și lungimea lor. Instrucțiunile care ating tabela
+                      users sau coloane ca password/email nu au niciodată
+                      valorile scrise.
+
+Rezumatul jurnalului, cu interogările grupate după forma lor (valorile
+literale înlocuite cu ?) și ordonate după timpul total:
+    python slow_query_log.py
+    python slow_query_log.py slow_queries.jsonl --top 10
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LOG_PATH = os.environ.get('SLOW_QUERY_LOG', os.path.join(BASE_DIR, 'slow_queries.jsonl'))
+THRESHOLD_MS = os.environ.get('SLOW_QUERY_MS', '50')
+LOG_PARAMETER_VALUES = os.environ.get('SLOW_QUERY_LOG_PARAMS') == '1'
+
+# Instrucțiunile ale căror parametri pot conține hash-uri de parolă sau date personale
+SENSITIVE_STATEMENT = re.compile(r'\busers\b|password|email', re.IGNORECASE)
+
+# Instrucțiunile pentru care se poate cere planul de execuție
+EXPLAINABLE = ('select', 'with', 'insert', 'update', 'delete')
+# Câte seturi de parametri se păstrează pentru un executemany
+MAX_LOGGED_PARAMETER_SETS = 5
+
+_write_lock = threading.Lock()
+
+def _route():
+    try:
+        from flask import has_request_context, request
+    except ImportError:
+        return None
+    if not has_request_context():
+        return None
+    return f'{request.method} {request.endpoint or request.path}'
+
+def _describe(value):
+    """Tipul unei valori și, pentru texte, lungimea ei: 'str(12)', 'int', 'NoneType'"""
+    if isinstance(value, (str, bytes)):
+        return f'{type(value).__name__}({len(value)})'
+    return type(value).__name__
+
+def _redact(parameters):
+    if isinstance(parameters, dict):
+        return {name: _describe(value) for name, value in parameters.items()}
+    return [_describe(value) for value in parameters]
+
+def _logged_parameters(statement, parameters, executemany):
+    """Parametrii de scris în jurnal: valorile doar la cerere și niciodată pentru date sensibile"""
+    show_values = LOG_PARAMETER_VALUES and not SENSITIVE_STATEMENT.search(statement)
+    if executemany:
+        first = list(parameters[:MAX_LOGGED_PARAMETER_SETS])
+        return {'count': len(parameters), 'first': first if show_values else [_redact(p) for p in first]}
+    return parameters if show_values else _redact(parameters)
+
+def explain(conn, cursor, statement, parameters):
+    """Planul de execuție al instrucțiunii, ca listă de rânduri text; None dacă nu poate fi obținut"""
+    dialect = conn.dialect.name
+    if dialect == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN '
+    elif dialect == 'postgresql':
+        prefix = 'EXPLAIN (ANALYZE off) '
+    else:
+        return None
+
+    explain_cursor = cursor.connection.cursor()
+    try:
+        if dialect == 'postgresql':
+            # O eroare în EXPLAIN ar anula tranzacția curentă; savepoint-ul o izolează
+            explain_cursor.execute('SAVEPOINT slow_query_explain')
+        try:
+            explain_cursor.execute(prefix + statement, parameters)
+            rows = explain_cursor.fetchall()
+        except Exception as e:
+            if dialect == 'postgresql':
+                explain_cursor.execute('ROLLBACK TO SAVEPOINT slow_query_explain')
+            return [f'EXPLAIN eșuat: {e}']
+        if dialect == 'postgresql':
+            explain_cursor.execute('RELEASE SAVEPOINT slow_query_explain')
+    finally:
+        explain_cursor.close()
+
+    if dialect == 'sqlite':
+        # Rândurile sunt (id, parent, notused, detail)
+        return [row[-1] for row in rows]
+    return [row[0] for row in rows]
+
+def write_entry(entry, path=None):
+    line = json.dumps(entry, ensure_ascii=False, default=str) + '\n'
+    with _write_lock:
+        with open(path or LOG_PATH, 'a', encoding='utf-8') as f:
+            f.write(line)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Pe context, ca momentul de start să nu rămână agățat de conexiune dacă instrucțiunea eșuează
+    if context is not None:
+        context._slow_query_started = time.perf_counter()
+
+def _make_after_cursor_execute(threshold_seconds):
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_slow_query_started', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        if elapsed < threshold_seconds:
+            return
+        plan = None
+        if not executemany and statement.lstrip().lower().startswith(EXPLAINABLE):
+            try:
+                plan = explain(conn, cursor, statement, parameters)
+            except Exception as e:
+                plan = [f'EXPLAIN eșuat: {e}']
+            if plan and SENSITIVE_STATEMENT.search(statement):
+                # Planul PostgreSQL repetă valorile parametrilor în condiții
+                plan = [_STRING_LITERAL.sub("'?'", line) for line in plan]
+        write_entry({
+            'time': datetime.now().isoformat(timespec='milliseconds'),
+            'duration_ms': round(elapsed * 1000, 2),
+            'route': _route(),
+            'statement': statement,
+            'parameters': _logged_parameters(statement, parameters, executemany),
+            'plan': plan,
+            'pid': os.getpid(),
+        })
+    return after_cursor_execute
+
+def init_engine(engine, threshold_ms=None):
+    """Pornește jurnalul pentru engine; întoarce False dacă este dezactivat"""
+    from sqlalchemy import event
+
+    threshold_ms = THRESHOLD_MS if threshold_ms is None else threshold_ms
+    if str(threshold_ms).strip().lower() in ('off', ''):
+        return False
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _make_after_cursor_execute(float(threshold_ms) / 1000))
+    return True
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%\(\w+\)s|%s|(?<!:):\w+|\?')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+
+def normalize_statement(statement):
+    """Forma instrucțiunii fără valori: literalii și parametrii devin ?, listele IN (?, ?, ...) devin (?)"""
+    text = _STRING_LITERAL.sub('?', statement)
+    text = _PLACEHOLDER.sub('?', text)
+    text = _NUMBER_LITERAL.sub('?', text)
+    text = ' '.join(text.split())
+    return _PLACEHOLDER_LIST.sub('(?)', text)
+
+def summarize(path):
+    """Intrările jurnalului grupate după instrucțiunea normalizată, cele mai costisitoare primele"""
+    groups = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            key = normalize_statement(entry['statement'])
+            group = groups.setdefault(key, {'statement': key, 'count': 0, 'total_ms': 0.0, 'durations': [],
+                                            'routes': {}, 'plan': None})
+            group['count'] += 1
+            group['total_ms'] += entry['duration_ms']
+            group['durations'].append(entry['duration_ms'])
+            route = entry.get('route') or '-'
+            group['routes'][route] = group['routes'].get(route, 0) + 1
+            if entry.get('plan'):
+                group['plan'] = entry['plan']
+
+    summary = []
+    for group in groups.values():
+        durations = sorted(group.pop('durations'))
+        group['max_ms'] = durations[-1]
+        group['p95_ms'] = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+        group['mean_ms'] = round(group['total_ms'] / group['count'], 2)
+        group['total_ms'] = round(group['total_ms'], 2)
+        summary.append(group)
+    summary.sort(key=lambda group: group['total_ms'], reverse=True)
+    return summary
+
+def full_scans(plan):
+    """Liniile planului SQLite care parcurg un tabel întreg (SCAN fără index)"""
+    return [line for line in plan or [] if line.startswith('SCAN') and 'USING' not in line]
+
+def main():
+    parser = argparse.ArgumentParser(description='Rezumatul jurnalului de interogări lente')
+    parser.add_argument('path', nargs='?', default=LOG_PATH, help='Fișierul jurnalului')
+    parser.add_argument('--top', type=int, default=20, help='Câte grupuri sunt afișate')
+    parser.add_argument('--json', action='store_true', help='Afișează rezumatul ca JSON')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        raise SystemExit(f'{args.path} nu există')
+    summary = summarize(args.path)[:args.top]
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+        return
+
+    for index, group in enumerate(summary, 1):
+        print(f"{index}. {group['count']} execuții, total {group['total_ms']:.0f} ms, "
+              f"medie {group['mean_ms']:.1f} ms, p95 {group['p95_ms']:.1f} ms, max {group['max_ms']:.1f} ms")
+        print(f"   {group['statement']}")
+        routes = sorted(group['routes'].items(), key=lambda item: item[1], reverse=True)
+        print('   rute: ' + ', '.join(f'{route} ({count})' for route, count in routes))
+        for line in group['plan'] or []:
+            print(f'   plan: {line}')
+        if full_scans(group['plan']):
+            print('   atenție: tabel parcurs integral, posibil index lipsă')
+        print()
+
+if __name__ == '__main__':
+    main()